@@ -1,6 +1,7 @@
 #Code uses distance method from "Preference Rankings - An Axiomatic Approach"
 import numpy as np
 from itertools import combinations
+import RankingKernels as rk
 
 def createMatrixWithTies(rank): #input list of ranks (like "rank" column in USAClimbing score sheets)
     """
@@ -25,17 +26,29 @@ def createMatrixWithTies(rank): #input list of ranks (like "rank" column in USAC
 def d(rankA, rankB):
     """
     #calculates number of pairwise disagreements between 2 ranks (A>B vs B>A is 2, A>B vs A=B is 1)
+    uses a merge sort (see RankingKernels.kendallDistances) so it is O(n log n) instead of comparing every pair
     :param rankA: first rank
     :param rankB: second rank
     :return: number of pairwise disagreements between the two ranks
     """
-    matrixA = createMatrixWithTies(rankA)
-    matrixB = createMatrixWithTies(rankB)
-    numCandidates = len(rankA)
-    distance = 0
-    for i, j in combinations(range(numCandidates), 2):
-        distance += abs(matrixA[i][j]-matrixB[i][j])
-    return distance
+    return float(rk.kendallDistances(rankA, np.reshape(rankB, (-1, 1)))[0])
+
+def distances(rank, ranks):
+    """
+    calculates d from one rank to every rank in ranks in one call
+    :param rank: rank the distances are measured from
+    :param ranks: numpy matrix where each column is a rank (like ClimbingRanker.ranks, rows are climbers)
+    :return: 1D numpy array where entry p is d(rank, column p of ranks)
+    """
+    return rk.kendallDistances(rank, ranks).astype(float)
+
+def distanceSum(rank, ranks):
+    """
+    :param rank: rank the distances are measured from
+    :param ranks: numpy matrix where each column is a rank (like ClimbingRanker.ranks, rows are climbers)
+    :return: sum of d from rank to every rank in ranks
+    """
+    return float(np.sum(distances(rank, ranks)))
 
 def createC(ranks):
     """
@@ -44,18 +57,8 @@ def createC(ranks):
     :param ranks: list of ranks of climbers on different problems
     :return: matrix C
     """
-    n = len(ranks[0])
-    c = np.zeros(shape=(n, n))
-    for i,j in combinations(range(n),2): #each pair of climbers i,j
-        sum=0
-        for rank in ranks:
-            if(rank[i]<rank[j]): #i is ranked higher than j
-                sum+=1
-            elif(rank[j]<rank[i]): #j is ranked higher than i
-                sum-=1
-        c[i,j] = -sum #made negative so we can minimize conformity
-        c[j,i] = sum #made positive so we can minimize conformity
-    return c
+    wins = rk.precedenceCounts(np.transpose(ranks))[0]
+    return -(wins - wins.T).astype(float) #made negative so we can minimize conformity
 
 def createX(finalRank):
     """
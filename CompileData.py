@@ -0,0 +1,49 @@
+import os
+import glob
+import numpy as np
+import GetTopsInfo as gti
+from ReadInData import ClimbingDataFile, compiledPath
+
+#one time "compile" step that turns each csv file in csvFiles into a folder of binary numpy arrays in compiledFiles.
+#ClimbingDataFile memory maps these (np.load(mmap_mode='r')) instead of parsing the csv file whenever the compiled
+#version was made from the current csv file, so processes can share one copy on disk
+
+def compileFile(fileName):
+    """
+    writes the compiled version of fileName: names, highMatrix, attemptsMatrix, rankMatrix, topsColumn and
+    topsPerProblem arrays plus info.npy = [mtime of csv file, size of csv file, tops status] where tops status is 1 if
+    topsPerProblem was determined, 0 if GetTopsInfo couldn't determine it and -1 if it isn't handled by GetTopsInfo
+    :param fileName: csv file in the csvFiles folder
+    """
+    data = ClimbingDataFile(fileName, 0)
+    data.openCSV(0) #always compile from the csv file itself
+    path = compiledPath(fileName) + "/"
+    os.makedirs(path, exist_ok=True)
+    np.save(path + "names.npy", np.array(data.names, dtype=str))
+    np.save(path + "highMatrix.npy", data.highMatrix)
+    np.save(path + "attemptsMatrix.npy", data.attemptsMatrix)
+    np.save(path + "rankMatrix.npy", data.rankMatrix)
+    np.save(path + "topsColumn.npy", data.topsColumn)
+    try:
+        topsPerProblem = gti.getTopsInfo(data.getPointsPerProblem(), data.getTops())
+        if(topsPerProblem is None): #getTopsInfo needs more cases for this data
+            topsStatus = -1
+        else:
+            np.save(path + "topsPerProblem.npy", topsPerProblem)
+            topsStatus = 1
+    except ValueError: #couldn't determine tops data
+        topsStatus = 0
+    source = os.stat("csvFiles/" + fileName)
+    #info.npy is written last so a half written folder is never treated as up to date
+    np.save(path + "info.npy", np.array([source.st_mtime_ns, source.st_size, topsStatus], dtype=np.int64))
+
+def compileAll():
+    """
+    compiles every csv file in the csvFiles folder
+    """
+    for path in sorted(glob.glob("csvFiles/*.csv")):
+        compileFile(os.path.basename(path))
+
+
+if __name__ == "__main__":
+    compileAll()
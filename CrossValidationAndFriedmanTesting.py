@@ -1,9 +1,17 @@
 from RankingMethodsClass import ClimbingRanker
 import RankingMethodsClass as rmc
-from itertools import combinations
+import RankingKernels as rk
+import LinearProgramming as lp
+import CrossValidationStore as cvs
 import numpy as np
 import FriedmanTest as ft
 import csv
+import argparse
+import os
+import concurrent.futures
+
+categories = ["fya", "fyb", "fyc","fyd","mya","myb","myc","myd"] #categories used for cross validation
+workerFolds = None #folds of every category in a cross validation worker process (see initWorker)
 
 
 def predictedError(rank, testRank):
@@ -11,15 +19,10 @@ def predictedError(rank, testRank):
     calculates predicted error as described in the rating methods paper from Braxton
     :param rank: 1D list
     :param testRank: aggregated rank created by some ranking method
-    :return: number corresponding to how well testRank predicted rank
+    :return: number corresponding to how well testRank predicted rank (the number of pairs i < j where i beat j in rank
+    but not in testRank or i and j tied in rank but not in testRank - see RankingKernels.predictedErrors)
     """
-    sum = 0
-    for i,j in combinations(range(len(testRank)), 2):
-        if(rank[i]<rank[j] and testRank[i]>= testRank[j]): #i beat j in the data but the testRank has i behind or tied with j
-            sum += 1
-        elif(rank[i] == rank[j] and testRank[i] != testRank[j]):
-            sum += 1
-    return sum
+    return rk.predictedErrors(rank, testRank)
 
 def merge(climbers1, climbers2, list1, list2, outproblem):
     """
@@ -149,6 +152,75 @@ def getTotal(blankPerProblem):
         total.append(sum)
     return total
 
+def alignRows(climbers1, climbers2):
+    """
+    :param climbers1: 1D list of climbers (the order the rows should end up in)
+    :param climbers2: 1D list of the same climbers in some other order
+    :return: numpy array where entry r is the index in climbers2 of climbers1[r] (so np.take(data2, it, axis=0) puts the
+    rows of data2 in the order of climbers1)
+    :raise ValueError: if the climbers in the two climber lists are not the same
+    """
+    index = {climber: row for row, climber in enumerate(climbers2)} #name -> row in climbers2
+    if(len(climbers1) != len(climbers2) or any(climber not in index for climber in climbers1)):
+        raise ValueError("climber lists do not match")
+    return np.array([index[climber] for climber in climbers1], dtype=int)
+
+def getFolds(cat):
+    """
+    creates the data for each of the 7 folds of cross validation for a category: the data from the climbers who made
+    semis on 6 of the 7 semis and qualis problems, and their ranks on the problem that was left out. the qualis rows are
+    put in the order of the semis climbers once (alignRows) and each fold just leaves one column out
+    :param cat: category (3 letter string like "fyd" - lowercase)
+    :return: list with a (ranker data, held out rank) pair for each fold, where ranker data is the list ClimbingRanker
+    takes for cross validation
+    """
+    semis = ClimbingRanker(cat + "BNatsSemis2016.csv")
+    qualis = ClimbingRanker(cat + "BNatsQualis2016.csv", len(semis.climbers)) #get data from those who made semis
+    rows = alignRows(semis.climbers, qualis.climbers)
+    #semis problems and then qualis problems, rows in the order of semis.climbers
+    allRanks, allTops, allPoints, allAttempts = [np.hstack((np.asarray(semisData, dtype=float),
+                                                            np.take(np.asarray(qualisData, dtype=float), rows, axis=0)))
+                                                 for semisData, qualisData in
+                                                 [(semis.ranks, qualis.ranks), (semis.topsPerProblem, qualis.topsPerProblem),
+                                                  (semis.pointsPerProblem, qualis.pointsPerProblem),
+                                                  (semis.attemptsPerProblem, qualis.attemptsPerProblem)]]
+    folds = []
+    for i in range(0,7):
+        kept = np.arange(allRanks.shape[1]) != i #every problem but problem i
+        ranks, topsPerProblem, pointsPerProblem, attemptsPerProblem = [matrix[:, kept] for matrix in
+                                                                      [allRanks, allTops, allPoints, allAttempts]]
+        for matrix in [ranks, topsPerProblem, pointsPerProblem, attemptsPerProblem]:
+            matrix.setflags(write=False) #the same fold is used for every method
+        points = pointsPerProblem.sum(axis=1).tolist()
+        tops = topsPerProblem.sum(axis=1).tolist()
+        attempts = attemptsPerProblem.sum(axis=1).tolist()
+        ranksi = allRanks[:, i].tolist() #ranks on problem i, in the same order as the other data
+        folds.append(([semis.climbers, 6, ranks, tops, attempts, attemptsPerProblem, points, pointsPerProblem,
+                       topsPerProblem, cat, "", True], ranksi))
+    return folds
+
+def getFoldError(num, cat, fold):
+    """
+    :param num: method number (see ClimbingRanker.runMethod)
+    :param cat: category the fold is from
+    :param fold: (ranker data, held out rank) pair from getFolds
+    :return: predicted error of the held out problem by the rank method num creates from the other 6 problems
+    """
+    return getFoldErrors([num], cat, fold)[0]
+
+def getFoldErrors(nums, cat, fold):
+    """
+    :param nums: list of method numbers (see ClimbingRanker.runMethod)
+    :param cat: category the fold is from
+    :param fold: (ranker data, held out rank) pair from getFolds
+    :return: list with the predicted error of the held out problem by the rank each method in nums creates from the
+    other 6 problems (the methods share one ClimbingRanker.runAll and the ranks are all scored at once with
+    RankingKernels.predictedErrors)
+    """
+    data, ranksi = fold
+    ranks = ClimbingRanker(cat, data).runAll(nums)
+    return rk.predictedErrors(ranksi, ranks).tolist() #test how well problem i is predicted with other problems
+
 def getCrossValidationScore(num):
     """
     performs cross validation using 7 problems from each of 8 age groups. 6 problems are used to create the aggregated
@@ -157,33 +229,105 @@ def getCrossValidationScore(num):
     :param method: method used to create aggregated rank
     :return: cross validation score for the given method
     """
-    categories = ["fya", "fyb", "fyc","fyd","mya","myb","myc","myd"]
     predictiveErrorSum = 0
     predictiveErrors = []
     for cat in categories:
-        semis = ClimbingRanker(cat + "BNatsSemis2016.csv")
-        qualis = ClimbingRanker(cat + "BNatsQualis2016.csv", len(semis.climbers)) #get data from those who made semis
         pESum = 0
-        for i in range(0,7):
-            ranks = merge(semis.climbers, qualis.climbers, semis.ranks, qualis.ranks, i)
-            topsPerProblem = merge(semis.climbers, qualis.climbers, semis.topsPerProblem, qualis.topsPerProblem, i)
-            pointsPerProblem = merge(semis.climbers, qualis.climbers, semis.pointsPerProblem, qualis.pointsPerProblem, i)
-            attemptsPerProblem = merge(semis.climbers, qualis.climbers, semis.attemptsPerProblem, qualis.attemptsPerProblem, i)
-            points = getTotal(pointsPerProblem)
-            tops = getTotal(topsPerProblem)
-            attempts = getTotal(attemptsPerProblem)
-            climbers = semis.climbers
-            if(i<len(semis.ranks[0])):
-                ranksi = getIth(semis.ranks, i)
-            else:
-                ranksi = getIth(qualis.ranks, i-len(semis.ranks[0]))
-            ranker = ClimbingRanker(cat, [climbers, 6, ranks, tops, attempts, attemptsPerProblem, points, pointsPerProblem, topsPerProblem, cat, "", True])
-            rank = ranker.runMethod(num)
-            predictiveErrorSum += predictedError(ranksi, rank) #test how well problem i is predicted with other problems
-            pESum += predictedError(ranksi, rank)
+        for fold in getFolds(cat):
+            error = getFoldError(num, cat, fold)
+            predictiveErrorSum += error
+            pESum += error
         predictiveErrors.append(pESum/7)
     return predictiveErrorSum/(len(categories)*7), predictiveErrors
 
+def initWorker(folds, solverSettings=None):
+    """
+    gives a cross validation worker process the folds of every category (done once per worker instead of once per task)
+    and the linear programming settings of the main process (a worker that isn't forked starts with the defaults)
+    :param folds: dictionary from category to its folds (see getFolds)
+    :param solverSettings: optional - dictionary made by LinearProgramming.getSolverSettings
+    """
+    global workerFolds
+    workerFolds = folds
+    if(solverSettings is not None):
+        lp.setSolverSettings(solverSettings)
+
+def getCellError(cell):
+    """
+    :param cell: (method number, category, fold number)
+    :return: predicted error for that cell (uses the folds given to this worker by initWorker)
+    """
+    num, cat, i = cell
+    return getFoldError(num, cat, workerFolds[cat][i])
+
+def getCrossValidationScores(nums, maxWorkers=None):
+    """
+    does the same thing as getCrossValidationScore for several methods at once. every (method, category, fold) cell is
+    independent, so the cells are run in a process pool. the folds are made once and given to each worker when it
+    starts, and the results are put back together in order, so the output doesn't depend on how the cells were run. if
+    CrossValidationStore.storePath is set, cells already saved there (for the same method version and fold data) aren't
+    run again and every new cell is saved as soon as it is done
+    :param nums: list of method numbers (see ClimbingRanker.runMethod)
+    :param maxWorkers: optional - number of worker processes (None uses one per cpu, 1 runs everything in this process)
+    :return: list with the (cross validation score, list of the score for each category) of each method in nums
+    """
+    folds = {}
+    dataHashes = {}
+    for cat in categories:
+        folds[cat] = getFolds(cat)
+        for i in range(0,7):
+            dataHashes[(cat, i)] = cvs.hashFold(folds[cat][i])
+    names = {num: rmc.getMethod(num) for num in nums}
+    versions = {num: rmc.getMethodVersion(names[num]) for num in nums}
+    connection = cvs.connect()
+    errors = {} #(method number, category, fold number) -> predicted error
+    cells = []
+    for num in nums:
+        for cat in categories:
+            for i in range(0,7):
+                error = cvs.get(connection, names[num], versions[num], cat, i, dataHashes[(cat, i)])
+                if(error is None):
+                    cells.append((num, cat, i))
+                else:
+                    errors[(num, cat, i)] = error
+
+    def save(cell, error):
+        num, cat, i = cell
+        errors[cell] = error
+        cvs.put(connection, names[num], versions[num], cat, i, dataHashes[(cat, i)], error)
+
+    try:
+        if(maxWorkers == 1): #every method is scored against a fold at once
+            for cat in categories:
+                for i in range(0,7):
+                    foldNums = [num for num, cellCat, cellI in cells if cellCat == cat and cellI == i]
+                    if(len(foldNums) > 0):
+                        for num, error in zip(foldNums, getFoldErrors(foldNums, cat, folds[cat][i])):
+                            save((num, cat, i), error)
+        elif(len(cells) > 0):
+            if(maxWorkers is None):
+                maxWorkers = os.cpu_count()
+            with concurrent.futures.ProcessPoolExecutor(max_workers=maxWorkers, initializer=initWorker,
+                                                        initargs=(folds, lp.getSolverSettings())) as pool:
+                futures = {pool.submit(getCellError, cell): cell for cell in cells}
+                for future in concurrent.futures.as_completed(futures): #save each cell as soon as it is done
+                    save(futures[future], future.result())
+    finally:
+        if(connection is not None):
+            connection.close()
+    scores = []
+    for num in nums:
+        predictiveErrorSum = 0
+        predictiveErrors = []
+        for cat in categories:
+            pESum = 0
+            for i in range(0,7):
+                predictiveErrorSum += errors[(num, cat, i)]
+                pESum += errors[(num, cat, i)]
+            predictiveErrors.append(pESum/7)
+        scores.append((predictiveErrorSum/(len(categories)*7), predictiveErrors))
+    return scores
+
 def writeCSVFile(methods, scores):
     """
     writes results of cross validation to CSV file so I can run the Friedman test on them in R
@@ -197,21 +341,42 @@ def writeCSVFile(methods, scores):
             for judge in range(0,len(scores[method])):
                 writer.writerow([judge+1, methods[method], scores[method][judge]])
 
-results = []
-methods = []
-#15 for just methods, 30 for methods and local kemenization of methods
-#13 is walg no tops - worse than other walgs
-#0 and 1 are l2 norm methods - not using anymore because they are dumb
-topsMethods = [2,4,7,8,9,10,11,12,14] #9 is abs10 method - doesn't use tops but does use flash bonus
-oldMethods = [8,9,10]
-usacMethods = [4,8,9,10]
-for num in topsMethods:
-    if(num != 13 and num != 28 and num != 0 and num != 1):
-        methods.append(rmc.getMethod(num))
-        results.append(getCrossValidationScore(num)[1])
-writeCSVFile(methods, results)
-
-for result in results:
-    print(result)
-
-print(ft.friedmanTest(*results))
\ No newline at end of file
+def main(args=None):
+    """
+    runs cross validation on methods, writes the scores to crossValidation.csv (for the Friedman test in R), prints them
+    and then prints the result of the Friedman test
+    :param args: optional - list of command line arguments (None uses sys.argv), run with -h to see them
+    """
+    #16 for just methods, 32 for methods and local kemenization of methods
+    #13 is walg no tops - worse than other walgs
+    #0 and 1 are l2 norm methods - not using anymore because they are dumb
+    topsMethods = [2,4,7,8,9,10,11,12,14] #9 is abs10 method - doesn't use tops but does use flash bonus
+    oldMethods = [8,9,10]
+    usacMethods = [4,8,9,10]
+    parser = argparse.ArgumentParser(description="cross validation and Friedman test of the ranking methods")
+    parser.add_argument("methods", nargs="*", type=int, default=topsMethods, help="method numbers to compare")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (1 = no process pool)")
+    parser.add_argument("--store", default="crossValidation.db",
+                        help="sqlite file finished cells are saved in and reused from (empty string to not save "
+                             "them) - bump RankingMethodsClass.methodVersions after changing a method's output or "
+                             "its old results are reused")
+    options = parser.parse_args(args)
+    results = []
+    methods = []
+    nums = []
+    cvs.setStorePath(options.store or None) #so a run that is stopped doesn't lose the cells it already did
+    for num in options.methods:
+        if(num != 13 and num != 29 and num != 0 and num != 1):
+            methods.append(rmc.getMethod(num))
+            nums.append(num)
+    for score in getCrossValidationScores(nums, options.workers):
+        results.append(score[1])
+    writeCSVFile(methods, results)
+
+    for result in results:
+        print(result)
+
+    print(ft.friedmanTest(*results))
+
+if __name__ == "__main__": #worker processes import this file, so only the main process runs the experiment
+    main()
@@ -0,0 +1,86 @@
+import hashlib
+import sqlite3
+import numpy as np
+
+#sqlite store of cross validation results (see CrossValidationAndFriedmanTesting.getCrossValidationScores). each
+#(method, category, fold) predicted error is saved as soon as it is computed, keyed by the method's version and a hash
+#of the fold's data, so a run that is stopped can pick up where it left off and a new method only costs its own cells.
+#a cell whose method version or data changed has a different key, so it is just computed again. the store can't tell
+#that a method's code changed: if a change to a method changes the ranks it gives, bump its entry in
+#RankingMethodsClass.methodVersions (or clear the store), otherwise the old saved results are used
+storePath = None #sqlite file results are saved in (None = don't save results)
+
+def setStorePath(path):
+    """
+    :param path: sqlite file cross validation results will be saved in and read from (None to not save results)
+    """
+    global storePath
+    storePath = path
+
+def connect():
+    """
+    :return: sqlite connection to storePath (the table is made if it isn't there yet) or None if storePath is None
+    """
+    if(storePath is None):
+        return None
+    connection = sqlite3.connect(storePath, isolation_level=None) #every write is committed right away
+    connection.execute("CREATE TABLE IF NOT EXISTS cells (method TEXT, version TEXT, category TEXT, fold INTEGER, "
+                       "dataHash TEXT, error REAL, PRIMARY KEY (method, version, category, fold, dataHash))")
+    return connection
+
+def hashFold(fold):
+    """
+    :param fold: (ranker data, held out rank) pair from CrossValidationAndFriedmanTesting.getFolds
+    :return: hex string of the sha256 hash of the climbers, the data matrices and the held out rank of the fold
+    """
+    data, ranksi = fold
+    digest = hashlib.sha256()
+    digest.update("\n".join(data[0]).encode())
+    for matrix in [data[2], data[5], data[7], data[8], ranksi]:
+        matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+        digest.update(np.array(matrix.shape, dtype=np.int64).tobytes())
+        digest.update(matrix.tobytes())
+    return digest.hexdigest()
+
+def get(connection, method, version, category, fold, dataHash):
+    """
+    :param connection: connection made by connect (None means there is no store)
+    :param method: method name (see RankingMethodsClass.getMethod)
+    :param version: method version (see RankingMethodsClass.getMethodVersion)
+    :param category: category the fold is from
+    :param fold: fold number (the problem that was left out)
+    :param dataHash: hash of the fold made by hashFold
+    :return: the saved predicted error or None if there isn't one
+    """
+    if(connection is None):
+        return None
+    row = connection.execute("SELECT error FROM cells WHERE method = ? AND version = ? AND category = ? AND fold = ? "
+                             "AND dataHash = ?", (method, version, category, fold, dataHash)).fetchone()
+    if(row is None):
+        return None
+    return row[0]
+
+def put(connection, method, version, category, fold, dataHash, error):
+    """
+    saves a predicted error (does nothing if connection is None)
+    :param connection: connection made by connect
+    :param method: method name (see RankingMethodsClass.getMethod)
+    :param version: method version (see RankingMethodsClass.getMethodVersion)
+    :param category: category the fold is from
+    :param fold: fold number (the problem that was left out)
+    :param dataHash: hash of the fold made by hashFold
+    :param error: predicted error of the cell
+    """
+    if(connection is None):
+        return
+    connection.execute("INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?, ?, ?)",
+                       (method, version, category, fold, dataHash, error))
+
+def clear():
+    """
+    removes every saved result from storePath
+    """
+    connection = connect()
+    if(connection is not None):
+        connection.execute("DELETE FROM cells")
+        connection.close()
@@ -0,0 +1,121 @@
+import os
+import threading
+from collections import OrderedDict
+import GetTopsInfo as gti
+from ReadInData import ClimbingDataFile
+
+#process-wide cache of parsed data sets so each csv file is only read (and its tops per problem only inferred) once.
+#entries are keyed by (path, number of climbers read, row indices read) and are thrown out if the file's mtime or size changes
+maxCacheSize = 64 #number of data sets kept before the least recently used one is dropped
+cache = OrderedDict()
+cacheLock = threading.Lock()
+
+
+class CachedDataSet:
+    """
+    a parsed ClimbingDataFile together with the file stamp it was read with and its derived topsPerProblem matrix
+    """
+    def __init__(self, stamp, dataFile):
+        """
+        :param stamp: (mtime, size) of the file when it was read
+        :param dataFile: ClimbingDataFile read from the file
+        """
+        self.stamp = stamp
+        self.dataFile = dataFile
+        self.topsPerProblem = dataFile.topsPerProblem #already known if the file was compiled (see CompileData.py)
+        self.topsError = None #ValueError raised by getTopsInfo (so it isn't recomputed just to fail again)
+        if(dataFile.topsUndeterminable):
+            self.topsError = ValueError("couldn't determine tops data")
+
+    def getTopsPerProblem(self):
+        """
+        :return: numpy matrix with 1 if climber i topped problem j and 0 otherwise (computed the first time it is asked for)
+        :raise ValueError: if tops data couldn't be determined
+        """
+        if(self.topsPerProblem is None and self.topsError is None):
+            try:
+                self.topsPerProblem = gti.getTopsInfo(self.dataFile.getPointsPerProblem(), self.dataFile.getTops())
+                if(self.topsPerProblem is not None):
+                    self.topsPerProblem.setflags(write=False)
+            except ValueError as e:
+                self.topsError = e
+        if(self.topsError is not None):
+            raise self.topsError
+        return self.topsPerProblem
+
+
+def getStamp(fileName):
+    """
+    :param fileName: file in csvFiles folder
+    :return: (mtime, size) of the file, used to tell if a cached copy is stale
+    """
+    info = os.stat("csvFiles/" + fileName)
+    return info.st_mtime_ns, info.st_size
+
+def getDataSet(fileName, n=0, rowIndices=None):
+    """
+    returns the cached data set for fileName, reading the file again only if it isn't cached or has changed on disk
+    :param fileName: file where data will be read in from
+    :param n: how many climbers will be read in from the data set (n=0 reads in all climbers)
+    :param rowIndices: optional - list of climber indices to read in instead of the first n climbers
+    :return: CachedDataSet for the file
+    """
+    key = (fileName, n, None if rowIndices is None else tuple(rowIndices))
+    stamp = getStamp(fileName)
+    with cacheLock:
+        entry = cache.get(key)
+        if(entry is not None and entry.stamp == stamp):
+            cache.move_to_end(key)
+            return entry
+    dataFile = ClimbingDataFile(fileName, n, rowIndices)
+    for matrix in [dataFile.rankMatrix, dataFile.highMatrix, dataFile.attemptsMatrix, dataFile.topsColumn]:
+        matrix.setflags(write=False) #shared between every ClimbingRanker made from this file
+    entry = CachedDataSet(stamp, dataFile)
+    with cacheLock:
+        cache[key] = entry
+        cache.move_to_end(key)
+        while(len(cache) > maxCacheSize):
+            cache.popitem(last=False) #least recently used
+    return entry
+
+def getDataFile(fileName, n=0, rowIndices=None):
+    """
+    :param fileName: file where data will be read in from
+    :param n: how many climbers will be read in from the data set (n=0 reads in all climbers)
+    :param rowIndices: optional - list of climber indices to read in instead of the first n climbers
+    :return: cached ClimbingDataFile for the file
+    """
+    return getDataSet(fileName, n, rowIndices).dataFile
+
+def getTopsPerProblem(fileName, n=0, rowIndices=None):
+    """
+    :param fileName: file where data will be read in from
+    :param n: how many climbers will be read in from the data set (n=0 reads in all climbers)
+    :param rowIndices: optional - list of climber indices to read in instead of the first n climbers
+    :return: cached topsPerProblem matrix for the file (see GetTopsInfo.getTopsInfo)
+    :raise ValueError: if tops data couldn't be determined
+    """
+    return getDataSet(fileName, n, rowIndices).getTopsPerProblem()
+
+def setMaxCacheSize(size):
+    """
+    changes how many data sets are kept in the cache, dropping the least recently used ones if there are too many
+    :param size: new maximum number of cached data sets
+    """
+    global maxCacheSize
+    with cacheLock:
+        maxCacheSize = size
+        while(len(cache) > maxCacheSize):
+            cache.popitem(last=False)
+
+def invalidate(fileName=None):
+    """
+    removes data sets from the cache so they are read in again next time
+    :param fileName: file to remove (every subset of climbers read from it), or None to empty the whole cache
+    """
+    with cacheLock:
+        if(fileName is None):
+            cache.clear()
+        else:
+            for key in [key for key in cache if key[0] == fileName]:
+                del cache[key]
@@ -0,0 +1,159 @@
+import numpy as np
+
+#exact solvers for the linear ordering problem behind the linear programming method (find the order of the climbers
+#that minimizes sum(c_ij) over every pair with i ranked ahead of j). they only need c, so they can be used in place of
+#the linear program for small sets of climbers, where they are faster and always give an integer (optimal) order
+
+dpMaxSize = 12 #largest number of climbers solved with the subset dynamic program (2^n subsets)
+
+def solve(c, n):
+    """
+    finds an optimal order with the subset dynamic program for up to dpMaxSize climbers and with branch and bound above
+    that
+    :param c: c for the linear program (see LinearProgramming.createC), flattened n x n
+    :param n: number of climbers being ranked
+    :return: resultant vector x (flattened n x n, x(i,j) = 1 if i is ranked ahead of j and 0 otherwise)
+    """
+    c = np.asarray(c, dtype=float).reshape(n, n)
+    if(n <= dpMaxSize):
+        order = subsetOrder(c)
+    else:
+        order = branchAndBoundOrder(c)
+    return orderToX(order, n)
+
+def orderToX(order, n):
+    """
+    :param order: climber indices from first to last
+    :param n: number of climbers being ranked
+    :return: resultant vector x (flattened n x n, x(i,j) = 1 if i is ranked ahead of j and 0 otherwise)
+    """
+    position = np.empty(n, dtype=int)
+    position[np.asarray(order, dtype=int)] = np.arange(n)
+    return (position[:, None] < position[None, :]).astype(float).flatten()
+
+def orderCost(c, order):
+    """
+    :param c: n x n numpy matrix c
+    :param order: climber indices from first to last
+    :return: sum of c(i,j) over every pair with i ahead of j in order
+    """
+    order = np.asarray(order, dtype=int)
+    return np.sum(np.triu(c[np.ix_(order, order)], 1))
+
+def insertionLocalSearch(c, order):
+    """
+    improves order by moving one climber at a time to the place in the order where it lowers the cost the most, until
+    no move lowers the cost. the change in cost of every place a climber could move to is found at once with cumulative
+    sums (moving climber e ahead of the climbers between its old and new place changes the cost by
+    sum(c(e,k) - c(k,e)) over those climbers k)
+    :param c: n x n numpy matrix c
+    :param order: climber indices from first to last
+    :return: improved order (list of climber indices from first to last)
+    """
+    order = [int(j) for j in order]
+    n = len(order)
+    improved = True
+    while(improved):
+        improved = False
+        for place in range(0, n):
+            climber = order[place]
+            others = np.array(order[:place] + order[place + 1:], dtype=int)
+            change = c[climber, others] - c[others, climber] #change in cost if climber moves from behind k to ahead of k
+            #deltas[q] = change in cost if climber ends up at place q
+            ahead = np.concatenate(([0], np.cumsum(change[:place][::-1])))[::-1] #moving ahead to place q <= place
+            behind = np.concatenate(([0], np.cumsum(-change[place:]))) #moving behind to place q >= place
+            deltas = np.concatenate((ahead[:-1], behind))
+            newPlace = int(np.argmin(deltas))
+            if(deltas[newPlace] < 0):
+                order = list(others[:newPlace]) + [climber] + list(others[newPlace:])
+                order = [int(j) for j in order]
+                improved = True
+    return order
+
+def subsetOrder(c):
+    """
+    Held-Karp style dynamic program over subsets of climbers: best[T] is the lowest cost of ranking the climbers in T
+    ahead of everyone else, and the climber in last place of T adds c(j,k) for every k not in T. each layer of subsets
+    with the same number of climbers is done at once with numpy
+    :param c: n x n numpy matrix c
+    :return: optimal order of the climbers (indices from first to last)
+    """
+    n = len(c)
+    if(n == 0):
+        return []
+    rowSums = np.sum(c, axis=1)
+    subsets = np.arange(1 << n)
+    bits = ((subsets[:, None] >> np.arange(n)) & 1).astype(bool) #bits[T][j] is true if j is in T
+    sizes = np.sum(bits, axis=1)
+    best = np.full(1 << n, np.inf)
+    best[0] = 0
+    last = np.zeros(1 << n, dtype=int) #climber in last place of the best order of T
+    for size in range(1, n + 1):
+        layer = subsets[sizes == size]
+        inLayer = bits[layer]
+        #cost of j being last in T = (best order of T without j) + sum of c(j,k) for k not in T
+        candidates = best[layer[:, None] ^ (1 << np.arange(n))] + rowSums - inLayer.astype(float) @ c.T
+        candidates[~inLayer] = np.inf
+        last[layer] = np.argmin(candidates, axis=1)
+        best[layer] = candidates[np.arange(len(layer)), last[layer]]
+    order = []
+    subset = (1 << n) - 1
+    while(subset != 0):
+        order.append(last[subset])
+        subset ^= 1 << last[subset]
+    return order[::-1]
+
+def branchAndBoundOrder(c):
+    """
+    depth first branch and bound that places climbers from first to last. the lower bound for the climbers that are left
+    is the sum of min(c(i,j), c(j,i)) over their pairs, and a climber is never placed right after a climber it should
+    be swapped with (c(i,j) > c(j,i)) because swapping them would always be better. the cost of finishing an order only
+    depends on which climbers are left, so a set of placed climbers that was already reached with a cost at most as low
+    is pruned too. starts from the order given by sorting the row sums of c (improved with insertionLocalSearch), so
+    there is always a good complete order to prune against
+    :param c: n x n numpy matrix c
+    :return: optimal order of the climbers (indices from first to last)
+    """
+    n = len(c)
+    pairMin = np.minimum(c, c.T)
+    np.fill_diagonal(pairMin, 0)
+    bestOrder = insertionLocalSearch(c, np.argsort(np.sum(c, axis=1), kind='stable'))
+    bestCost = [orderCost(c, bestOrder)] #list so search can update it
+    remaining = np.ones(n, dtype=bool)
+    reached = {} #set of placed climbers (bitmask) -> lowest cost it has been reached with
+
+    def search(order, placed, cost, remainingCosts, bound):
+        """
+        :param order: climbers placed so far
+        :param placed: bitmask of the climbers in order
+        :param cost: cost of the pairs that have a placed climber in them
+        :param remainingCosts: remainingCosts[j] is the sum of c(j,k) for every k still remaining
+        :param bound: lower bound for the cost of the pairs of remaining climbers
+        """
+        if(len(order) == n):
+            if(cost < bestCost[0]):
+                bestCost[0] = cost
+                bestOrder[:] = order
+            return
+        candidates = np.flatnonzero(remaining)
+        if(len(order) > 0): #don't place a climber right after one it should be ahead of
+            previous = order[-1]
+            candidates = candidates[c[previous, candidates] <= c[candidates, previous]]
+        candidates = candidates[np.argsort(remainingCosts[candidates], kind='stable')]
+        for j in candidates:
+            nextBound = bound - np.sum(pairMin[j][remaining])
+            nextCost = cost + remainingCosts[j]
+            if(nextCost + nextBound >= bestCost[0]):
+                continue
+            nextPlaced = placed | (1 << int(j))
+            if(reached.get(nextPlaced, np.inf) <= nextCost):
+                continue
+            reached[nextPlaced] = nextCost
+            remaining[j] = False
+            order.append(j)
+            search(order, nextPlaced, nextCost, remainingCosts - c[:, j], nextBound)
+            order.pop()
+            remaining[j] = True
+
+    search([], 0, 0, np.sum(c, axis=1), np.sum(np.triu(pairMin, 1)))
+    return [int(j) for j in bestOrder]
@@ -1,5 +1,4 @@
 import numpy as np
-import scipy.stats as ss
 
 def friedmanTest(*args):
     """
@@ -7,6 +6,7 @@ def friedmanTest(*args):
     :param args: each input is a group (ratings for one measurement)
     :return: chi square value and p-value
     """
+    import scipy.stats as ss #only loaded when the test is run
     data = []
     for arg in args:
         data.append(arg)
@@ -20,7 +20,7 @@ def friedmanTest(*args):
     k = len(data)
     n = len(data[1])
     chisquare = 12/(n*k*(k+1))*tg - 3*n*(k+1)
-    p = ss.chisqprob(chisquare, k-1)
+    p = ss.chi2.sf(chisquare, k-1) #chisqprob was removed from scipy, chi2.sf is the same thing
     return chisquare, p
 
 def sumList(list):
@@ -1,21 +1,26 @@
-import scipy.optimize
+import concurrent.futures
 import numpy as np
-from itertools import combinations
-import BubbleDistance as bd
+import RankingKernels as rk
+import ExactKemeny as ek
+import SolutionCache as sc
+
+cutTolerance = 1e-6 #how far a transitivity constraint can be broken before a cut is added for it (see solveLP)
+exactMaxSize = 20 #sets of at most this many climbers are ranked exactly by ExactKemeny instead of the linear program
+useSolutionCache = True #True to reuse solutions of sets of climbers that were already solved (see SolutionCache.py)
+#scipy is imported inside the functions that need it, so importing this file (and RankingMethodsClass) stays fast
+#when no linear program is ever solved
 
 def createEqualityMatrix(n): #creates matrix for equality constraint for rankings of n items
     """
     :param n: number of climbers being ranked
-    :return: matrix for equality constraint in linear programming (xij + xji = 1)
-    """
-    numRows = len(list(combinations(range(n), 2)))
-    matrix = np.zeros(shape=(numRows,n**2)) #n choose 2 rows, n^2 columns
-    row = 0
-    for i,j in combinations(range(n),2):
-        matrix[row][sub2ind([n,n],i,j)] = 1
-        matrix[row][sub2ind([n,n],j,i)] = 1
-        row+=1
-    return matrix
+    :return: sparse matrix for equality constraint in linear programming (xij + xji = 1), n choose 2 rows and n^2 columns
+    """
+    import scipy.sparse
+    i, j = np.triu_indices(n, 1) #each pair of climbers i,j (same order as combinations)
+    numRows = len(i)
+    rows = np.repeat(np.arange(numRows), 2)
+    cols = np.column_stack((sub2ind([n,n], i, j), sub2ind([n,n], j, i))).ravel()
+    return scipy.sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(numRows, n**2))
 
 def sub2ind(array_shape, rows, cols): #FROM ONLINE
     """turn matrix ij reference into simple index reference if that matrix was actually a list"""
@@ -25,54 +30,162 @@ def sub2ind(array_shape, rows, cols): #FROM ONLINE
 def createInequalityMatrix(n):
     """
     :param n: number of climbers being ranked
-    :return: matrix for inequality constraint for linear programming
-    """
-    numRows = int(n*(n-1)*(n-2)/3) #always integer anyway so don't have to worry about it
-    matrix = np.zeros(shape=(numRows, n**2))
-    row = 0
-    for i,j,k in combinations(range(n), 3):
-        #(ijk)
-        matrix[row][sub2ind([n,n], i, j)] = 1
-        matrix[row][sub2ind([n,n], j, k)] = 1
-        matrix[row][sub2ind([n,n], k, i)] = 1
-        row+=1
-        #(ikj)
-        matrix[row][sub2ind([n,n], i, k)] = 1
-        matrix[row][sub2ind([n,n], k, j)] = 1
-        matrix[row][sub2ind([n,n], j, i)] = 1
-        row+=1
+    :return: sparse matrix for inequality constraint for linear programming (xij + xjk + xki <= 2 and
+    xik + xkj + xji <= 2 for each set of three climbers), n(n-1)(n-2)/3 rows and n^2 columns with 3 nonzeros per row
+    """
+    import scipy.sparse
+    numTriples = n*(n - 1)*(n - 2)//6
+    numRows = 2*numTriples
+    indexType = np.int32 if max(n**2, 3*numRows) < 2**31 else np.int64
+    #columns of each row, filled in directly (one first climber i at a time) so nothing bigger than the matrix is made
+    columns = np.empty((numTriples, 2, 3), dtype=indexType)
+    start = 0
+    for i in range(0, n - 2):
+        j, k = np.triu_indices(n - i - 1, 1) #every j < k after i (same order as combinations)
+        j += i + 1
+        k += i + 1
+        block = columns[start:start + len(j)]
+        #(ijk) and then (ikj) for each set of three climbers
+        block[:, 0, 0], block[:, 0, 1], block[:, 0, 2] = sub2ind([n,n], i, j), sub2ind([n,n], j, k), sub2ind([n,n], k, i)
+        block[:, 1, 0], block[:, 1, 1], block[:, 1, 2] = sub2ind([n,n], i, k), sub2ind([n,n], k, j), sub2ind([n,n], j, i)
+        start += len(j)
+    rowStarts = np.arange(0, 3*numRows + 1, 3, dtype=indexType)
+    matrix = scipy.sparse.csr_matrix((np.ones(3*numRows), columns.reshape(-1), rowStarts), shape=(numRows, n**2))
+    matrix.sort_indices()
     return matrix
 
+def createCycleMatrix(n, cycles):
+    """
+    :param n: number of climbers being ranked
+    :param cycles: numpy matrix where each row (a,b,c) is the constraint xab + xbc + xca <= 2
+    :return: sparse matrix for those inequality constraints, one row per cycle and n^2 columns
+    """
+    import scipy.sparse
+    cycles = np.asarray(cycles, dtype=int).reshape(-1, 3)
+    a, b, c = cycles[:, 0], cycles[:, 1], cycles[:, 2]
+    rows = np.repeat(np.arange(len(cycles)), 3)
+    cols = np.column_stack((sub2ind([n,n], a, b), sub2ind([n,n], b, c), sub2ind([n,n], c, a))).ravel()
+    return scipy.sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(cycles), n**2))
+
+def findViolatedCycles(x, n, tolerance=None):
+    """
+    checks every set of three climbers for the transitivity constraints x (a solution to the linear program) breaks,
+    one smallest climber a at a time (all b,c > a at once), so only O(n^2) memory is used besides the broken constraints
+    :param x: resultant vector x from the linear program
+    :param n: number of climbers being ranked
+    :param tolerance: optional - how far over 2 a constraint has to be to count as broken (None uses cutTolerance)
+    :return: numpy matrix where each row (a,b,c) is a broken constraint xab + xbc + xca <= 2 (a is the smallest of the
+    three so each constraint only shows up once)
+    """
+    if(tolerance is None):
+        tolerance = cutTolerance
+    matrix = np.asarray(x, dtype=float).reshape(n, n)
+    cycles = [np.zeros((0, 3), dtype=int)]
+    for a in range(0, n - 2):
+        later = slice(a + 1, n)
+        #cycleSums[b][c] = xab + xbc + xca for the climbers b,c after a
+        cycleSums = matrix[a, later][:, None] + matrix[later, later] + matrix[later, a][None, :]
+        np.fill_diagonal(cycleSums, -np.inf) #b == c isn't a set of three climbers
+        b, c = np.nonzero(cycleSums > 2 + tolerance)
+        if(len(b) > 0):
+            cycles.append(np.column_stack((np.full(len(b), a), b + a + 1, c + a + 1)))
+    return np.concatenate(cycles)
+
+def majorityComponents(c, n):
+    """
+    splits the climbers into the strongly connected components of the majority graph (an edge from i to j if at least
+    as many lists have i above j as j above i). every climber in a component is ranked above every climber in the
+    components after it by a strict majority of the lists, so an optimal ranking keeps each component together in
+    this order and only the climbers inside a component have to be ranked by the linear program
+    :param c: c for the linear program (see createC)
+    :param n: number of climbers being ranked
+    :return: list of numpy arrays of climber indices, one for each component, in the order they are ranked
+    """
+    import scipy.sparse
+    import scipy.sparse.csgraph
+    margin = -np.asarray(c, dtype=float).reshape(n, n) #(# of lists with i above j) - (# of lists with j above i)
+    graph = (margin >= 0) & ~np.eye(n, dtype=bool)
+    numComponents, labels = scipy.sparse.csgraph.connected_components(scipy.sparse.csr_matrix(graph), directed=True,
+                                                                      connection='strong')
+    #every pair of climbers has an edge, so the components are totally ordered and each climber has an edge to every
+    #climber in the components after its own, so sorting the components by that number puts them in order
+    beaten = np.zeros(numComponents, dtype=int)
+    beaten[labels] = np.sum(graph & (labels[:, None] != labels[None, :]), axis=1)
+    order = np.argsort(-beaten, kind='stable')
+    return [np.flatnonzero(labels == label) for label in order]
+
+def solveLPDecomposed(c, n, lazyCuts=False):
+    """
+    solves the linear program separately inside each component of the majority graph (see majorityComponents) and puts
+    the components in order, which gives an optimal solution of the whole linear program with many small programs
+    (each component is solved with solveGroup, so small components are solved exactly)
+    :param c: c for the linear program (see createC)
+    :param n: number of climbers being ranked
+    :param lazyCuts: optional - True to add the transitivity constraints as they are needed (see solveLP)
+    :return: resultant vector x from the linear program
+    """
+    components = majorityComponents(c, n)
+    position = np.zeros(n, dtype=int) #which component each climber is in (in ranked order)
+    for i, component in enumerate(components):
+        position[component] = i
+    x = (position[:, None] < position[None, :]).astype(float)
+    cMatrix = np.asarray(c, dtype=float).reshape(n, n)
+    for component in components:
+        m = len(component)
+        if(m > 1):
+            block = np.ix_(component, component)
+            x[block] = solveGroup(cMatrix[block].flatten(), m, lazyCuts).reshape(m, m)
+    return x.flatten()
+
+def solveLP(c, n, lazyCuts=False):
+    """
+    solves the linear program for a ranking of n climbers with scipy's HiGHS solver (the constraint matrices are
+    sparse, so this works for whole fields of climbers). with lazyCuts, the program is first solved with only the
+    equality constraints and then the transitivity constraints that the solution breaks are added and it is solved
+    again, until none are broken (usually only a small fraction of the n(n-1)(n-2)/3 constraints are ever needed).
+    both ways find an optimal solution, but if there is more than one they don't have to find the same one
+    :param c: c for the linear program (see createC)
+    :param n: number of climbers being ranked
+    :param lazyCuts: optional - True to add the transitivity constraints as they are needed (cutting planes)
+    :return: resultant vector x from the linear program
+    """
+    import scipy.optimize
+    beq = np.ones(int(n*(n-1)/2))
+    if(not(lazyCuts)):
+        bub = np.full(int(n*(n-1)*(n-2)/3), 2)
+        lp = scipy.optimize.linprog(c, A_ub = createInequalityMatrix(n), b_ub = bub, A_eq = createEqualityMatrix(n),
+                                    b_eq = beq, method = 'highs')
+        return lp.get("x")
+    equalityMatrix = createEqualityMatrix(n)
+    cycles = np.zeros(shape=(0, 3), dtype=int) #transitivity constraints added so far
+    while(True):
+        if(len(cycles) == 0):
+            lp = scipy.optimize.linprog(c, A_eq = equalityMatrix, b_eq = beq, method = 'highs')
+        else:
+            lp = scipy.optimize.linprog(c, A_ub = createCycleMatrix(n, cycles), b_ub = np.full(len(cycles), 2),
+                                        A_eq = equalityMatrix, b_eq = beq, method = 'highs')
+        x = lp.get("x")
+        violated = findViolatedCycles(x, n)
+        if(len(violated) == 0):
+            return x
+        cycles = np.vstack((cycles, violated))
+
 def createC(rankings):
     """
     :param rankings: numpy matrix where each row corresponds to a climber and each column is a problem. each entry is
     that climber's rank on the problem
     :return: matrix where c(i,j) is (# of lists with i>j) - (# of lists with j>i) (except is is flattened to a list)
     """
-    #flip rankings so each row is a complete ranking instead of each row being that climber's ranks
-    ranks =[[]]
-    #gets ranks set up to be correct dimensions
-    for row in range(0,len(rankings[0])):
-        for col in range(0,len(rankings)):
-            ranks[row].append(0)
-        if(row != len(rankings[0])-1):
-            ranks.append([])
-    #puts values in ranks
-    for row in range(0, len(ranks)):
-        for col in range(0, len(ranks[0])):
-            ranks[row][col] = rankings[col][row]
-    n = len(ranks[0]) #number of climbers being ranked
-    c = [0]*(n**2)
-    for i,j in combinations(range(n),2): #each pair of climbers i,j
-        sum=0
-        for rank in ranks:
-            if(rank[i]<rank[j]): #i is ranked higher than j
-                sum+=1
-            elif(rank[j]<rank[i]): #j is ranked higher than i
-                sum-=1
-        c[sub2ind([n,n],i,j)] = -sum #would be positive in normal matrix C but negate value so python can minimize it
-        c[sub2ind([n, n], j, i)] = sum  # would be negative in normal matrix C but switch value so python can minimize it
-    return c
+    wins = rk.precedenceCounts(rankings)[0]
+    return createCFromPrecedence(wins - wins.T)
+
+def createCFromPrecedence(precedence):
+    """
+    :param precedence: numpy matrix where entry (i,j) is (# of lists with i above j) - (# of lists with j above i)
+    (like ClimbingRanker.getPrecedenceMatrix)
+    :return: c for the linear program (flattened and negated so python can minimize it)
+    """
+    return -np.asarray(precedence, dtype=float).flatten()
 
 def makeMatrix(list): #makes the resultant vector x into a matrix
     """
@@ -94,12 +207,11 @@ def calculateConformity(rank, c):
     :param c: c matrix as used in linear programming (reflects the ranks that rank is an aggregation of)
     :return: conformity as determined in linear programing
     """
-    x = bd.createX(rank)
-    sum = 0
-    for row in range(0,len(x)):
-        for col in range(0,len(x)):
-            sum += x[row][col]*c[sub2ind([len(x), len(x)], row, col)]
-    return sum
+    rank = np.asarray(rank)
+    n = len(rank)
+    #x as made by bd.createX: x(i,j) = 1 if i is ranked ahead of j (only pairs with i < j are filled in)
+    x = np.triu(rank[:, None] < rank[None, :], 1)
+    return np.sum(np.asarray(c, dtype=float).reshape(n, n)[x])
 
 def getFinalRank(matrix, c):
     """
@@ -328,7 +440,85 @@ def smash(smashedRanks, finalRank, i, nList):
     smashedRanks += shiftedRanks
 
 
-def optimize(ranks, climbers, tops): #does not do the spliced list
+def solveGroup(c, n, lazyCuts=False):
+    """
+    solves a set of at most exactMaxSize climbers exactly (ExactKemeny.solve gives an integer optimal solution, which
+    the linear program doesn't always find) and bigger sets with the linear program. the climbers are always put in
+    canonicalOrder before solving, so turning the cache on or off doesn't change which optimal solution is found. if
+    useSolutionCache is True, solutions are looked up in SolutionCache by a hash of c (in that order) first
+    :param c: c for the linear program (see createC)
+    :param n: number of climbers being ranked
+    :param lazyCuts: True to add the transitivity constraints as they are needed (see solveLP)
+    :return: resultant vector x from the linear program
+    """
+    #relabel the climbers so the same set of climbers usually gets the same key however they are ordered in the data
+    #(climbers that canonicalOrder can't tell apart keep their order, so this isn't guaranteed), and always solve in
+    #that order so a solution from the cache is the same as solving again
+    order = canonicalOrder(c, n)
+    canonicalC = np.asarray(c, dtype=float).reshape(n, n)[np.ix_(order, order)]
+    if(useSolutionCache):
+        key = sc.makeKey(canonicalC, getSolverName(n, lazyCuts))
+        canonicalX = sc.get(key)
+        if(canonicalX is None):
+            canonicalX = solveUncached(canonicalC.flatten(), n, lazyCuts)
+            sc.put(key, canonicalX)
+    else:
+        canonicalX = solveUncached(canonicalC.flatten(), n, lazyCuts)
+    x = np.zeros(shape=(n, n))
+    x[np.ix_(order, order)] = np.reshape(canonicalX, (n, n))
+    return x.flatten()
+
+def getSolverName(n, lazyCuts=False):
+    """
+    :param n: number of climbers being ranked
+    :param lazyCuts: True if the transitivity constraints are added as they are needed (see solveLP)
+    :return: string naming the solver and every setting that can change which optimal solution it finds (used in
+    SolutionCache keys, so a cached solution is the one solving again with the current settings would give)
+    """
+    if(n <= exactMaxSize):
+        return "exact dpMaxSize=%d" % ek.dpMaxSize #the dynamic program and branch and bound can find different orders
+    import scipy
+    if(lazyCuts):
+        return "lazyCuts cutTolerance=%r scipy=%s" % (cutTolerance, scipy.__version__)
+    return "linprog scipy=%s" % scipy.__version__
+
+def solveUncached(c, n, lazyCuts=False):
+    """
+    :param c: c for the linear program (see createC)
+    :param n: number of climbers being ranked
+    :param lazyCuts: True to add the transitivity constraints as they are needed (see solveLP)
+    :return: resultant vector x from ExactKemeny.solve if n is at most exactMaxSize and from the linear program otherwise
+    """
+    if(n <= exactMaxSize):
+        return ek.solve(c, n)
+    return solveLP(c, n, lazyCuts)
+
+def canonicalOrder(c, n):
+    """
+    orders climbers by things that don't depend on how the climbers are labeled (the sum of their row of c and then the
+    sorted entries of their row), keeping climbers that are the same on all of these in the order they were in
+    :param c: c for the linear program (see createC)
+    :param n: number of climbers being ranked
+    :return: numpy array of climber indices in canonical order
+    """
+    matrix = np.asarray(c, dtype=float).reshape(n, n)
+    sortedRows = np.sort(matrix, axis=1)
+    keys = [sortedRows[:, col] for col in range(n - 1, -1, -1)] + [np.sum(matrix, axis=1)]
+    return np.lexsort(keys) #lexsort sorts by the last key first
+
+def solve(c, n, lazyCuts=False, decompose=False):
+    """
+    :param c: c for the linear program (see createC)
+    :param n: number of climbers being ranked
+    :param lazyCuts: True to add the transitivity constraints as they are needed (see solveLP)
+    :param decompose: True to solve each component of the majority graph separately (see solveLPDecomposed)
+    :return: resultant vector x from the linear program
+    """
+    if(decompose):
+        return solveLPDecomposed(c, n, lazyCuts)
+    return solveGroup(c, n, lazyCuts)
+
+def optimize(ranks, climbers, tops, precedence=None, lazyCuts=False, decompose=False): #does not do the spliced list
     """
     uses scipy's linear program solver to determine optimal rank
     trying to maximize cij * xij, where cij is the number of lists with
@@ -339,18 +529,71 @@ def optimize(ranks, climbers, tops): #does not do the spliced list
     :param ranks: numpy matrix with each column representing a complete ranking of climbers on the given problem
     :param climbers: 1D list of climbers
     :param tops: 1D list of total tops for each climber
+    :param precedence: optional - precedence matrix of ranks (see ClimbingRanker.getPrecedenceMatrix) so it doesn't
+    have to be calculated again
+    :param lazyCuts: optional - True to only add the transitivity constraints that are needed (see solveLP)
+    :param decompose: optional - True to solve the linear program separately for each component of the majority graph
+    (see solveLPDecomposed)
     :return: optimal rank that maximizes conformity
     """
     n = len(climbers)
-    bub = [2]*int((n*(n-1)*(n-2)/3))
-    beq = [1]*int((n*(n-1)/2))
-    c = createC(ranks)
-    lp = scipy.optimize.linprog(c, A_ub = createInequalityMatrix(n), b_ub = bub, A_eq = createEqualityMatrix(n), b_eq = beq)
-    matrix = makeMatrix(lp.get("x"))
+    if(precedence is None):
+        c = createC(ranks)
+    else:
+        c = createCFromPrecedence(precedence)
+    matrix = makeMatrix(solve(c, n, lazyCuts, decompose))
     finalrank = getFinalRank(matrix, c)
     return sortByTops(finalrank, climbers, tops)
 
-def optimizeSplit(ranks, climbers, tops):
+def rankSet(c, n, lazyCuts=False, decompose=False):
+    """
+    finds the optimal rank of one set of climbers (module level so it can be run in another process)
+    :param c: c for the linear program (see createC)
+    :param n: number of climbers being ranked
+    :param lazyCuts: True to add the transitivity constraints as they are needed (see solveLP)
+    :param decompose: True to solve each component of the majority graph separately (see solveLPDecomposed)
+    :return: final rank of the set of climbers (not yet sorted by tops)
+    """
+    return getFinalRank(makeMatrix(solve(c, n, lazyCuts, decompose)), c)
+
+def getSolverSettings():
+    """
+    :return: dictionary with the module level settings that change which solution is found (of this file, ExactKemeny
+    and SolutionCache), so they can be given to worker processes with setSolverSettings
+    """
+    return {"cutTolerance": cutTolerance, "exactMaxSize": exactMaxSize, "useSolutionCache": useSolutionCache,
+            "dpMaxSize": ek.dpMaxSize, "cacheDirectory": sc.cacheDirectory, "maxCacheSize": sc.maxCacheSize}
+
+def setSolverSettings(settings):
+    """
+    sets the module level solver settings (used as the initializer of process pools, because a worker process that
+    isn't forked starts with the default settings instead of the ones changed in the main process)
+    :param settings: dictionary made by getSolverSettings
+    """
+    global cutTolerance, exactMaxSize, useSolutionCache
+    cutTolerance = settings["cutTolerance"]
+    exactMaxSize = settings["exactMaxSize"]
+    useSolutionCache = settings["useSolutionCache"]
+    ek.dpMaxSize = settings["dpMaxSize"]
+    sc.setCacheDirectory(settings["cacheDirectory"])
+    sc.setMaxCacheSize(settings["maxCacheSize"])
+
+def createExecutor(executor, maxWorkers=None):
+    """
+    :param executor: "thread" for a thread pool or "process" for a process pool
+    :param maxWorkers: optional - most threads or processes that will be used (None lets concurrent.futures decide)
+    :return: concurrent.futures executor (worker processes get the solver settings of this process)
+    :raise ValueError: if executor isn't "thread" or "process"
+    """
+    if(executor == "thread"):
+        return concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers)
+    elif(executor == "process"):
+        return concurrent.futures.ProcessPoolExecutor(max_workers=maxWorkers, initializer=setSolverSettings,
+                                                      initargs=(getSolverSettings(),))
+    raise ValueError("executor must be serial, thread or process: ", executor)
+
+def optimizeSplit(ranks, climbers, tops, precedence=None, lazyCuts=False, decompose=False, executor="serial",
+                  maxWorkers=None):
     """
     splits problem up by number of tops, so find optimal rank for each set of climbers
     with the same number of tops
@@ -363,20 +606,40 @@ def optimizeSplit(ranks, climbers, tops):
     :param ranks: numpy matrix with each column representing a complete ranking of climbers on the given problem
     :param climbers: 1D list of climbers
     :param tops: 1D list of total tops for each climber
+    :param precedence: optional - precedence matrix of ranks (see ClimbingRanker.getPrecedenceMatrix). re-ranking a
+    set of tops doesn't change who is above who, so each set's c is just its block of this matrix
+    :param lazyCuts: optional - True to only add the transitivity constraints that are needed (see solveLP)
+    :param decompose: optional - True to solve the linear program separately for each component of the majority graph
+    (see solveLPDecomposed)
+    :param executor: optional - "serial" to solve the sets of tops one after another, or "thread" or "process" to solve
+    them at the same time in a thread or process pool (the sets are independent and are put back together in order)
+    :param maxWorkers: optional - most threads or processes the pool will use
     :return: optimal rank that maximizes conformity
+    :raise ValueError: if executor isn't "serial", "thread" or "process"
     """
+    if(executor not in ("serial", "thread", "process")):
+        raise ValueError("executor must be serial, thread or process: ", executor)
     ranksList, nList, climberList = splitProblemByTops(ranks, tops, climbers)
     smashedRanks = []
     smashedClimbers = []
+    cList = [] #c for each set of tops
+    start = 0 #index of the first climber in the current set of tops
     for i in range(0,len(ranksList)):
         n = nList[i]
-        bub = [2] * int((n * (n - 1) * (n - 2) / 3))
-        beq = [1] * int((n * (n - 1) / 2))
-        c = createC(ranksList[i])
-        lp = scipy.optimize.linprog(c, A_ub = createInequalityMatrix(n), b_ub = bub, A_eq = createEqualityMatrix(n), b_eq = beq)
-        finalRank = getFinalRank(makeMatrix(lp.get("x")), c)
+        if(precedence is None):
+            cList.append(createC(ranksList[i]))
+        else:
+            cList.append(createCFromPrecedence(np.asarray(precedence)[start:start + n, start:start + n]))
+        start += n
+    settings = ([lazyCuts]*len(cList), [decompose]*len(cList))
+    if(executor == "serial" or len(cList) < 2):
+        finalRanks = list(map(rankSet, cList, nList, *settings))
+    else:
+        with createExecutor(executor, maxWorkers) as pool:
+            finalRanks = list(pool.map(rankSet, cList, nList, *settings)) #map keeps the sets in order
+    for i in range(0,len(finalRanks)):
         #finalClimberRank = getFinalClimberRank(finalRank, climberList[i])
-        smash(smashedRanks, finalRank, i, nList)
+        smash(smashedRanks, finalRanks[i], i, nList)
         #smashedClimbers += finalClimberRank
     rank, climberRank = sortByTops(smashedRanks, climbers, tops)
     return rank, climberRank
@@ -3,6 +3,7 @@ import LinearProgramming as lp
 import numpy as np
 import RankingMethodsClass as rmc
 from itertools import combinations
+import argparse
 
 
 def makeRanks(matrix):
@@ -163,6 +164,18 @@ def testIndependence2(methodNum): #randomly choose 2 climbers and see if rank is
 independentMethods = [8,9,10]
 #14 for all methods
 topsMethods = [1,2,4,7,11,12,14] #that aren't independent
-#for i in topsMethods:
-testIndependence2(12)
-testIndependence2(11)
+
+def main(args=None):
+    """
+    runs testIndependence2 on methods
+    :param args: optional - list of command line arguments (None uses sys.argv), run with -h to see them
+    """
+    parser = argparse.ArgumentParser(description="test if the ranking methods are independent of irrelevant climbers")
+    parser.add_argument("methods", nargs="*", type=int, default=[12, 11], help="method numbers to test")
+    options = parser.parse_args(args)
+    for num in options.methods:
+        testIndependence2(num)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+import numpy as np
+
+#vectorized kernels shared by the ranking methods in RankingMethodsClass. every kernel reduces along the last (problem)
+#axis, so ranks can be a single data set (climbers x problems) or a stack of equally sized data sets
+#(data sets x climbers x problems) that are all scored in one call
+
+tieTolerance = 1e-12 #scores closer together than this are treated as the same score (floating point error from logs)
+
+def bordaScores(ranks):
+    """
+    :param ranks: numpy array where the last axis is the problems and each entry is a climber's rank on the problem
+    :return: sum of each climber's ranks (lower is better)
+    """
+    return np.sum(np.asarray(ranks, dtype=float), axis=-1)
+
+def l2NormScores(ranks):
+    """
+    :param ranks: numpy array where the last axis is the problems and each entry is a climber's rank on the problem
+    :return: square root of the sum of the squares of each climber's ranks (lower is better)
+    """
+    ranks = np.asarray(ranks, dtype=float)
+    return np.sqrt(np.sum(ranks*ranks, axis=-1))
+
+def geometricMeanScores(ranks):
+    """
+    uses the mean of the logs of the ranks instead of multiplying them together so the score doesn't overflow or lose
+    precision as the number of problems grows. the log of the geometric mean is ordered the same way as the geometric
+    mean, and scores that only differ by floating point error are snapped together so ties are kept
+    :param ranks: numpy array where the last axis is the problems and each entry is a climber's rank on the problem
+    :return: log of the geometric mean of each climber's ranks (lower is better)
+    """
+    return snapTies(np.mean(np.log(np.asarray(ranks, dtype=float)), axis=-1))
+
+def snapTies(scores, tolerance=tieTolerance):
+    """
+    gives scores that are within tolerance of the next closest score the same value (the smallest score in that group)
+    :param scores: numpy array of scores, ties are looked for along the last axis
+    :param tolerance: largest gap between two scores that still counts as a tie
+    :return: numpy array of scores with the same shape as scores
+    """
+    scores = np.asarray(scores, dtype=float)
+    if(scores.shape[-1] == 0):
+        return scores.copy()
+    order = np.argsort(scores, axis=-1, kind='stable')
+    sortedScores = np.take_along_axis(scores, order, axis=-1)
+    groupStarts = np.ones(scores.shape, dtype=bool)
+    groupStarts[..., 1:] = np.diff(sortedScores, axis=-1) > tolerance
+    #index of the first score in each score's group
+    startIndices = np.maximum.accumulate(np.where(groupStarts, np.arange(scores.shape[-1]), 0), axis=-1)
+    snapped = np.empty_like(scores)
+    np.put_along_axis(snapped, order, np.take_along_axis(sortedScores, startIndices, axis=-1), axis=-1)
+    return snapped
+
+def lexicographicRank(keys):
+    """
+    ranks climbers lexicographically by a list of keys (ties on the first key are broken by the second key and so on)
+    using one np.lexsort, so it is O(n log n) and doesn't change the keys it is given. climbers who tie on every key
+    get the same place and the next place is skipped (competition ranking, like 1,2,2,4)
+    :param keys: list of (values, direction) pairs in order of importance where values is a 1D list with a value for
+    each climber and direction is "max" if a higher value is better or "min" if a lower value is better
+    :return: 1D list where each entry is the final rank of that climber
+    :raise ValueError: if a direction isn't "max" or "min"
+    """
+    columns = []
+    for values, direction in keys:
+        values = np.asarray(values, dtype=float)
+        if(direction == "max"):
+            values = -values
+        elif(direction != "min"):
+            raise ValueError("direction must be max or min: ", direction)
+        columns.append(values)
+    numClimbers = len(columns[0])
+    order = np.lexsort(columns[::-1]) #lexsort sorts by the last key first
+    sortedColumns = np.stack([column[order] for column in columns])
+    newPlace = np.ones(numClimbers, dtype=bool) #true if the climber doesn't tie the climber ahead of them
+    newPlace[1:] = np.any(sortedColumns[:, 1:] != sortedColumns[:, :-1], axis=0)
+    places = np.maximum.accumulate(np.where(newPlace, np.arange(1, numClimbers + 1), 0))
+    finalRank = np.empty(numClimbers, dtype=int)
+    finalRank[order] = places
+    return finalRank.tolist()
+
+def averageTiedRanks(ranks):
+    """
+    gives climbers who tie on a problem the average of the places they take up (two climbers tied for 3rd both get 3.5),
+    for every problem at once. for a complete competition ranking (like 1,2,2,4) this is the same as
+    scipy.stats.rankdata(method='average') on each column, and ranks that aren't tied are left alone
+    :param ranks: numpy matrix where each row is a climber and each column is a problem, entries are the rank of each
+    climber on each problem
+    :return: numpy matrix the same shape as ranks with tied ranks averaged
+    """
+    ranks = np.asarray(ranks, dtype=float)
+    numClimbers = ranks.shape[0]
+    if(numClimbers == 0):
+        return ranks.copy()
+    order = np.argsort(ranks, axis=0, kind='stable')
+    sortedRanks = np.take_along_axis(ranks, order, axis=0)
+    positions = np.arange(numClimbers).reshape(-1, *([1] * (ranks.ndim - 1)))
+    groupStarts = np.ones(ranks.shape, dtype=bool) #true for the first climber in each group of tied climbers
+    groupStarts[1:] = sortedRanks[1:] != sortedRanks[:-1]
+    groupEnds = np.ones(ranks.shape, dtype=bool) #true for the last climber in each group of tied climbers
+    groupEnds[:-1] = groupStarts[1:]
+    firstInGroup = np.maximum.accumulate(np.where(groupStarts, positions, 0), axis=0)
+    lastInGroup = np.flip(np.minimum.accumulate(np.flip(np.where(groupEnds, positions, numClimbers - 1), axis=0), axis=0), axis=0)
+    averaged = sortedRanks + (lastInGroup - firstInGroup)/2 #tied for place r with k climbers: (r + ... + r+k-1)/k
+    tiedRanks = np.empty_like(ranks)
+    np.put_along_axis(tiedRanks, order, averaged, axis=0)
+    return tiedRanks
+
+def weiszfeld(points, tolerance=.1, maxIterations=1000):
+    """
+    uses weiszfeld's algorithm to calculate the geometric median of points (in Euclidean space), starting from their
+    centroid. stops once an iteration moves less than tolerance or after maxIterations iterations. uses the Vardi-Zhang
+    modification when the current estimate lands on one of the points instead of dividing by zero
+    :param points: numpy matrix where each row is a point (for ranks, each row is the complete rank on one problem)
+    :param tolerance: stop once the estimate moves at most this far (Euclidean distance) in one iteration
+    :param maxIterations: largest number of iterations that will be done
+    :return: geometric median (1D numpy array), number of iterations done and residual (distance moved in the last
+    iteration)
+    """
+    points = np.asarray(points, dtype=float)
+    current = points.mean(axis=0) #initial estimate: centroid
+    iterations = 0
+    residual = np.inf
+    while(iterations < maxIterations):
+        nextEstimate = weiszfeldStep(points, current)
+        residual = np.sqrt(np.sum((nextEstimate - current)**2))
+        current = nextEstimate
+        iterations += 1
+        if(residual <= tolerance):
+            break
+    return current, iterations, residual
+
+def weiszfeldStep(points, estimate):
+    """
+    calculates the next estimate of the geometric median in weiszfeld's algorithm. if estimate is one of the points, the
+    Vardi-Zhang step is used: the usual step over the other points is pulled back toward estimate by
+    (number of points at estimate)/r, where r is the length of the sum of the unit vectors from estimate to the other points
+    :param points: numpy matrix where each row is a point
+    :param estimate: current estimate (1D numpy array)
+    :return: next estimate (1D numpy array)
+    """
+    distances = np.sqrt(np.sum((points - estimate)**2, axis=1))
+    coincident = distances == 0
+    others = ~coincident
+    if(not(others.any())): #every point is at estimate
+        return estimate.copy()
+    weights = 1/distances[others]
+    nextEstimate = weights @ points[others] / np.sum(weights)
+    numCoincident = np.count_nonzero(coincident)
+    if(numCoincident == 0):
+        return nextEstimate
+    r = np.sqrt(np.sum((weights @ (points[others] - estimate))**2))
+    if(r <= numCoincident): #estimate is already the geometric median
+        return estimate.copy()
+    return (1 - numCoincident/r)*nextEstimate + (numCoincident/r)*estimate
+
+def thresholdRanks(rating, thresholds, tops=None):
+    """
+    turns a rating (lower is better) into a rank for every tie threshold at once. the rating is sorted once (by tops
+    first if tops are given) and then for each threshold, climbers next to each other in that order tie if their ratings
+    are within the threshold (and they have the same number of tops). ratings that only differ by floating point error
+    are snapped together first (see snapTies), so equal ratings tie even with a threshold of 0
+    :param rating: 1D list of ratings (like the output of weiszfeld's algorithm)
+    :param thresholds: 1D list of tie thresholds
+    :param tops: optional - 1D list of total tops for each climber (more tops always ranks ahead of fewer tops)
+    :return: numpy matrix where row t is the rank for thresholds[t] (rows = thresholds, columns = climbers)
+    """
+    rating = snapTies(rating)
+    thresholds = np.asarray(thresholds, dtype=float).reshape(-1, 1)
+    numClimbers = len(rating)
+    if(tops is None):
+        order = np.argsort(rating, kind='stable')
+        sameTops = np.ones(max(numClimbers - 1, 0), dtype=bool)
+    else:
+        tops = np.asarray(tops)
+        order = np.lexsort((rating, -tops))
+        sortedTops = tops[order]
+        sameTops = sortedTops[1:] == sortedTops[:-1]
+    gaps = np.diff(rating[order])
+    newPlace = np.ones((len(thresholds), numClimbers), dtype=bool) #true if the climber doesn't tie the climber ahead
+    newPlace[:, 1:] = ~((gaps <= thresholds) & sameTops)
+    places = np.maximum.accumulate(np.where(newPlace, np.arange(1, numClimbers + 1), 0), axis=1)
+    ranks = np.empty_like(places)
+    ranks[:, order] = places
+    return ranks
+
+def euclideanDistanceSums(candidateRanks, rankings):
+    """
+    :param candidateRanks: numpy matrix where each row is a candidate aggregated rank
+    :param rankings: numpy matrix where each row is a complete rank (like ClimbingRanker.flippedRanks)
+    :return: 1D numpy array with the sum of the Euclidean distances from each candidate rank to every rank in rankings
+    """
+    differences = np.asarray(candidateRanks, dtype=float)[:, None, :] - np.asarray(rankings, dtype=float)[None, :, :]
+    return np.sum(np.sqrt(np.sum(differences**2, axis=2)), axis=1)
+
+def precedenceCounts(ranks):
+    """
+    counts, for every pair of climbers, how many problems ranked one above the other, using broadcasting instead of
+    looping over pairs
+    :param ranks: numpy matrix where each row is a climber and each column is a problem, entries are the rank of each
+    climber on each problem
+    :return: wins (numpy matrix where wins[i][j] is the number of problems where i is ranked above j) and ties (numpy
+    matrix where ties[i][j] is the number of problems where i and j tie, 0 on the diagonal)
+    """
+    ranks = np.asarray(ranks, dtype=float)
+    wins = np.sum(ranks[:, None, :] < ranks[None, :, :], axis=2)
+    ties = ranks.shape[1] - wins - wins.T
+    np.fill_diagonal(ties, 0)
+    return wins, ties
+
+def kemenyPairCosts(wins, ties):
+    """
+    for every pair of climbers, the sum of the distances (BubbleDistance.d) to the ranks on every problem that comes
+    from just that pair, for each way an aggregated rank can order the pair: a problem that agrees adds 0, a problem that
+    ties where the aggregated rank doesn't (or doesn't tie where it does) adds 1 and a problem that has them the other
+    way around adds 2
+    :param wins: numpy matrix where wins[i][j] is the number of problems where i is ranked above j
+    :param ties: numpy matrix where ties[i][j] is the number of problems where i and j tie
+    :return: aheadCost (numpy matrix where entry (i,j) is the cost of ranking i above j, so the cost of ranking i below j
+    is aheadCost[j][i]) and tiedCost (numpy matrix where entry (i,j) is the cost of tying i and j)
+    """
+    return ties + 2*wins.T, wins + wins.T
+
+def kemenyDistanceSum(rank, wins, ties):
+    """
+    calculates the sum of the distances (BubbleDistance.d) from rank to the ranks on every problem using only the
+    precedence counts (see kemenyPairCosts)
+    :param rank: 1D list with the rank of each climber
+    :param wins: numpy matrix where wins[i][j] is the number of problems where i is ranked above j
+    :param ties: numpy matrix where ties[i][j] is the number of problems where i and j tie
+    :return: sum of the distances from rank to the rank on each problem
+    """
+    rank = np.asarray(rank, dtype=float)
+    aheadCost, tiedCost = kemenyPairCosts(wins, ties)
+    ahead = rank[:, None] < rank[None, :]
+    behind = rank[:, None] > rank[None, :]
+    cost = np.where(ahead, aheadCost, np.where(behind, aheadCost.T, tiedCost))
+    return np.sum(np.triu(cost, 1))
+
+def denseCodes(values):
+    """
+    :param values: numpy array, codes are made along the last axis
+    :return: numpy int array the same shape as values where the smallest value in each row is 0, the next smallest is 1
+    and so on (equal values get the same code)
+    """
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(values, axis=-1, kind='stable')
+    sortedValues = np.take_along_axis(values, order, axis=-1)
+    newValue = np.zeros(values.shape, dtype=np.int64)
+    newValue[..., 1:] = np.diff(sortedValues, axis=-1) > 0
+    codes = np.empty_like(newValue)
+    np.put_along_axis(codes, order, np.cumsum(newValue, axis=-1), axis=-1)
+    return codes
+
+def strictInversions(values):
+    """
+    counts pairs k < l with values[k] > values[l] (equal values aren't inversions) in every row at once with a bottom-up
+    merge sort, so it is O(n log n) per row. each level merges neighbouring sorted blocks with np.searchsorted (blocks are
+    offset so every block of every row can be searched in one call)
+    :param values: numpy matrix, inversions are counted along each row
+    :return: 1D numpy array with the number of inversions in each row
+    """
+    codes = denseCodes(np.atleast_2d(values))
+    numRows, n = codes.shape
+    inversions = np.zeros(numRows, dtype=np.int64)
+    size = 1
+    while(size < n):
+        size *= 2
+    #pad with a code bigger than every other code so the padding is never part of an inversion
+    merged = np.full((numRows, size), n, dtype=np.int64)
+    merged[:, :n] = codes
+    width = 1 #length of the sorted blocks being merged
+    while(width < size):
+        numBlocks = size//(2*width)
+        blocks = merged.reshape(numRows, numBlocks, 2, width)
+        offsets = (np.arange(numRows*numBlocks).reshape(numRows, numBlocks, 1))*(n + 1)
+        left = (blocks[:, :, 0, :] + offsets).ravel()
+        right = (blocks[:, :, 1, :] + offsets).ravel()
+        blockStarts = (offsets//(n + 1))*width
+        #number of left elements <= each right element, and number of right elements < each left element (same block)
+        leftAtMost = np.searchsorted(left, right, side='right').reshape(numRows, numBlocks, width) - blockStarts
+        rightBelow = np.searchsorted(right, left, side='left').reshape(numRows, numBlocks, width) - blockStarts
+        inversions += np.sum(width - leftAtMost, axis=(1, 2))
+        positions = np.arange(width)
+        nextMerged = np.empty((numRows, numBlocks, 2*width), dtype=np.int64)
+        np.put_along_axis(nextMerged, positions + rightBelow, blocks[:, :, 0, :], axis=2)
+        np.put_along_axis(nextMerged, positions + leftAtMost, blocks[:, :, 1, :], axis=2)
+        merged = nextMerged.reshape(numRows, size)
+        width *= 2
+    return inversions
+
+def tiedPairs(values):
+    """
+    :param values: numpy array, ties are counted along the last axis
+    :return: numpy array with the number of pairs of equal values along the last axis
+    """
+    sortedValues = np.sort(np.asarray(values), axis=-1)
+    n = sortedValues.shape[-1]
+    groupStarts = np.ones(sortedValues.shape, dtype=bool)
+    groupStarts[..., 1:] = sortedValues[..., 1:] != sortedValues[..., :-1]
+    #each value is tied with every value before it in its group
+    startIndices = np.maximum.accumulate(np.where(groupStarts, np.arange(n), 0), axis=-1)
+    return np.sum(np.arange(n) - startIndices, axis=-1)
+
+def kendallDistances(rank, ranks):
+    """
+    calculates the distance with ties (BubbleDistance.d: A>B vs B>A is 2, A>B vs A=B is 1) from rank to every rank in
+    ranks without looking at every pair of climbers. the distance is 2*(# of pairs in opposite order) +
+    (# of pairs tied in rank) + (# of pairs tied in the other rank) - 2*(# of pairs tied in both). pairs in opposite order
+    are counted by sorting by rank (ties broken by the other rank) and counting the inversions left in the other rank
+    :param rank: 1D list with the rank of each climber
+    :param ranks: numpy matrix where each row is a climber and each column is a rank (like ClimbingRanker.ranks)
+    :return: 1D numpy array where entry p is the distance from rank to column p of ranks
+    """
+    rank = np.asarray(rank, dtype=float)
+    others = np.asarray(ranks, dtype=float).reshape(len(rank), -1).T #each row is a rank
+    candidate = np.broadcast_to(rank, others.shape)
+    order = np.lexsort((others, candidate), axis=-1)
+    opposite = strictInversions(np.take_along_axis(others, order, axis=-1))
+    tiedInRank = tiedPairs(rank)
+    tiedInOthers = tiedPairs(others)
+    #pairs tied in both are pairs with the same (rank, other rank) codes
+    pairCodes = denseCodes(candidate)*(len(rank) + 1) + denseCodes(others)
+    tiedInBoth = tiedPairs(pairCodes)
+    return 2*opposite + tiedInRank + tiedInOthers - 2*tiedInBoth
+
+def predictedErrors(rank, testRanks):
+    """
+    calculates CrossValidationAndFriedmanTesting.predictedError of every rank in testRanks at once by comparing the
+    signs of the differences of every pair i < j: a pair counts if i beat j in rank but not in the test rank, or if i
+    and j tied in rank but not in the test rank
+    :param rank: 1D list with the rank of each climber on the held out problem
+    :param testRanks: 1D list (one aggregated rank) or numpy matrix where each row is an aggregated rank
+    :return: number of pairs predicted wrong (int if testRanks is one rank and 1D numpy array with the number for each
+    row otherwise)
+    """
+    rank = np.asarray(rank, dtype=float)
+    testRanks = np.asarray(testRanks, dtype=float)
+    first, second = np.triu_indices(len(rank), 1)
+    rankSigns = np.sign(rank[first] - rank[second])
+    testSigns = np.sign(testRanks[..., first] - testRanks[..., second])
+    wrong = ((rankSigns < 0) & (testSigns >= 0)) | ((rankSigns == 0) & (testSigns != 0))
+    errors = np.sum(wrong, axis=-1)
+    if(errors.ndim == 0):
+        return int(errors)
+    return errors
+
+def kwikSortOrder(cost, rng):
+    """
+    orders items with KwikSort: a random pivot is picked, the items whose cost of being ahead of the pivot is lower than
+    the pivot's cost of being ahead of them go ahead of it and the rest go behind it, and the same is done to each side
+    (with a list of sides to do instead of recursion)
+    :param cost: numpy matrix where entry (i,j) is the cost of ranking i ahead of j
+    :param rng: numpy random Generator used to pick the pivots
+    :return: 1D numpy array of item indices from first to last
+    """
+    n = len(cost)
+    order = np.empty(n, dtype=int)
+    sides = [(np.arange(n), 0)] #(items, place in order of the first of them)
+    while(len(sides) > 0):
+        items, start = sides.pop()
+        if(len(items) == 0):
+            continue
+        pivot = items[rng.integers(len(items))]
+        others = items[items != pivot]
+        ahead = cost[others, pivot] < cost[pivot, others]
+        order[start + np.count_nonzero(ahead)] = pivot
+        sides.append((others[ahead], start))
+        sides.append((others[~ahead], start + np.count_nonzero(ahead) + 1))
+    return order
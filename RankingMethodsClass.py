@@ -1,10 +1,14 @@
-from ReadInData import ClimbingDataFile
-import GetTopsInfo as gti
+import DataCache as dc
+import RankingKernels as rk
+import ExactKemeny as ek
 import SomeStatsStuff as sss
 import numpy as np
-import BubbleDistance as bd
 import LinearProgramming as lp
-import copy
+
+#version of each method (by name) - bump it when a change to a method changes the ranks it gives, so saved cross
+#validation results for it are computed again (see CrossValidationStore.py). methods that aren't listed are version 1
+#and "lk" is the version of local kemenization
+methodVersions = {}
 
 
 class ClimbingRanker:
@@ -49,7 +53,7 @@ class ClimbingRanker:
                 self.complete = args[0][11]
             else:
                 if(isinstance(args[0], int)): #also used for cross validation, also if you just want part of data set
-                    self.data = ClimbingDataFile(fileName, args[0])
+                    self.data = dc.getDataFile(fileName, args[0])
                     self.climbers = self.data.getClimbers()
                     self.numProblems = self.data.numProblems
                     self.numClimbers = len(self.climbers)
@@ -60,14 +64,14 @@ class ClimbingRanker:
                     self.attemptsPerProblem = self.data.getAttemptsPerProblem()
                     self.points = self.data.getPoints()
                     self.pointsPerProblem = self.data.getPointsPerProblem()
-                    self.topsPerProblem = gti.getTopsInfo(self.pointsPerProblem, self.tops)
+                    self.topsPerProblem = dc.getTopsPerProblem(fileName, args[0])
                     self.category = fileName[0:3]
                     self.round = fileName[4:len(fileName)-4]
                     self.complete = False
                 else:
                     raise ValueError("Invalid arguments")
         else:
-            self.data = ClimbingDataFile(fileName, 0)
+            self.data = dc.getDataFile(fileName, 0)
             self.climbers = self.data.getClimbers()
             self.numProblems = self.data.numProblems
             self.numClimbers = len(self.climbers)
@@ -78,15 +82,38 @@ class ClimbingRanker:
             self.attemptsPerProblem = self.data.getAttemptsPerProblem()
             self.points = self.data.getPoints()
             self.pointsPerProblem = self.data.getPointsPerProblem()
-            self.topsPerProblem = gti.getTopsInfo(self.pointsPerProblem, self.tops)
+            self.topsPerProblem = dc.getTopsPerProblem(fileName, 0)
             self.complete = True
             self.round = fileName[4:len(fileName)-4]
             self.category = fileName[0:3]
+        #intermediates shared by several methods, calculated the first time a method needs them (see runAll)
+        self.usacRankingPoints = None #tie averaged ranks
+        self.attemptSplit = None #attempts to top and attempts to high point
+        self.flashes = None
+        self.holdPointsPerProblem = None #value of one hold on each problem (abs10 and merged methods)
+        self.weiszfeldRating = None #geometric median of the ranks
+        self.pairwiseWins = None #precedence counts for each pair of climbers (see getPrecedenceCounts)
+        self.pairwiseTies = None
+        self.kemenyPairCosts = None #(aheadCost, tiedCost) used to score local kemenization moves
+        self.kemenizeMaxPasses = None #most passes locallyKemenize makes (None = until no move is better)
+        self.kemenizePasses = None #number of passes the last local kemenization made
+        self.lpLazyCuts = False #True to add the linear program's transitivity constraints as they are needed
+        self.lpDecompose = False #True to solve the linear program separately for each component of the majority graph
+        self.lpExecutor = "serial" #"serial", "thread" or "process" - how linearProgrammingOptimalSplit solves its sets of tops
+        self.lpMaxWorkers = None #most threads or processes used when lpExecutor isn't serial
+        self.kwikSortSeed = 0 #seed for the random pivots of kwikSortMethod (so its rank can be reproduced)
+        self.kwikSortRestarts = 10 #number of KwikSort orders kwikSortMethod picks the best of
+        self.weiszfeldSettings = None #(tolerance, max iterations) weiszfeldRating was calculated with
+        self.weiszfeldTolerance = .1 #weiszfeld's algorithm stops when an iteration moves less than this
+        self.weiszfeldMaxIterations = 1000
+        self.weiszfeldThresholds = [0, .1, .2, .3, .4, .5] #tie thresholds tried by the optimal weiszfeld methods
+        self.weiszfeldIterations = None #iterations and residual of the last run of weiszfeld's algorithm
+        self.weiszfeldResidual = None
         self.methods = [self.l2NormMethodNoTops, self.l2NormMethod, self.geometricMeanMethod,
                         self.geometricMeanMethodNoTops, self.usacMethod, self.usacMethodNoTops,
                         self.bordaMethodNoTops, self.bordaMethod, self.mergedOldMethod, self.abs10Method,
                         self.topScoreMethod, self.wAlgorithmInteger, self.wAlgorithmOptimalInteger, self.wAlgorithmNoTops,
-                        self.linearProgrammingOptimalSplit]
+                        self.linearProgrammingOptimalSplit, self.kwikSortMethod]
 
     def bordaMethod(self):  # l1 norm method
         """
@@ -95,12 +122,8 @@ class ClimbingRanker:
         higher numbers in totalPoints list are worse).
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the borda method
         """
-        topsList = self.tops.copy()  # copy it so you don't change the original tops list when tops gets changed in getMinIndexWithTops
-        totalPoints = [0] * self.numClimbers  # will store borda points for each climber
-        for climber in range(0, self.numClimbers):
-            for problem in range(0, self.numProblems):
-                totalPoints[climber] += self.ranks[climber][problem]
-        return self.__calculateFinalRank(topsList, totalPoints)
+        totalPoints = rk.bordaScores(self.ranks).tolist()  # borda points for each climber
+        return self.__calculateFinalRank(self.tops, totalPoints)
 
     def bordaMethodNoTops(self):
         """
@@ -108,10 +131,7 @@ class ClimbingRanker:
         on each problem and then rank them based on these totalPoint numbers (higher numbers in totalPoints list are worse)
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the borda method
         """
-        totalPoints = [0] * self.numClimbers  # will store borda points for each climber
-        for climber in range(0, self.numClimbers):
-            for problem in range(0, self.numProblems):
-                totalPoints[climber] += self.ranks[climber][problem]
+        totalPoints = rk.bordaScores(self.ranks).tolist()  # borda points for each climber
         return self.__calculateFinalRankNoTops(totalPoints)
 
     # usac current method (if you use usac ranking points as calculated below)
@@ -123,14 +143,8 @@ class ClimbingRanker:
         (n = number of problems, lower number is better)
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the geometric mean method
         """
-        topsList = self.tops.copy()  # copy it so you don't change the original tops list when tops gets changed in getMinIndexWithTops
-        totalPoints = [0] * self.numClimbers  # will store points for each climber
-        for climber in range(0, self.numClimbers):
-            product = 1
-            for problem in range(0, self.numProblems):
-                product *= self.ranks[climber][problem]
-            totalPoints[climber] = product ** (1 / self.numProblems)
-        return self.__calculateFinalRank(topsList, totalPoints)
+        totalPoints = rk.geometricMeanScores(self.ranks).tolist()  # log of geometric mean for each climber (same order)
+        return self.__calculateFinalRank(self.tops, totalPoints)
 
     def geometricMeanMethodNoTops(self):
         """
@@ -138,12 +152,7 @@ class ClimbingRanker:
         on each problem and then rank them based on the nth root of these products (n = number of problems, lower number is better)
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the geometric mean method
         """
-        totalPoints = [0] * self.numClimbers  # will store points for each climber
-        for climber in range(0, self.numClimbers):
-            product = 1
-            for problem in range(0, self.numProblems):
-                product *= self.ranks[climber][problem]
-            totalPoints[climber] = product ** (1 / self.numProblems)
+        totalPoints = rk.geometricMeanScores(self.ranks).tolist()  # log of geometric mean for each climber (same order)
         return self.__calculateFinalRankNoTops(totalPoints)
 
     def usacMethod(self):
@@ -155,14 +164,8 @@ class ClimbingRanker:
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the geometric mean method
         """
         rankings = self.__getUSAClimbingRankingPoints()
-        topsList = self.tops.copy()  # copy it so you don't change the original tops list when tops gets changed in getMinIndexWithTops
-        totalPoints = [0] * self.numClimbers  # will store points for each climber
-        for climber in range(0, self.numClimbers):
-            product = 1
-            for problem in range(0, self.numProblems):
-                product *= rankings[climber][problem]
-            totalPoints[climber] = product ** (1 / self.numProblems)
-        return self.__calculateFinalRank(topsList, totalPoints)
+        totalPoints = rk.geometricMeanScores(rankings).tolist()  # log of geometric mean for each climber (same order)
+        return self.__calculateFinalRank(self.tops, totalPoints)
 
     def usacMethodNoTops(self):
         """
@@ -172,12 +175,7 @@ class ClimbingRanker:
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the geometric mean method
         """
         rankings = self.__getUSAClimbingRankingPoints()
-        totalPoints = [0] * self.numClimbers  # will store points for each climber
-        for climber in range(0, self.numClimbers):
-            product = 1
-            for problem in range(0, self.numProblems):
-                product *= rankings[climber][problem]
-            totalPoints[climber] = product ** (1 / self.numProblems)
+        totalPoints = rk.geometricMeanScores(rankings).tolist()  # log of geometric mean for each climber (same order)
         return self.__calculateFinalRankNoTops(totalPoints)
 
     def l2NormMethod(self):
@@ -187,14 +185,8 @@ class ClimbingRanker:
         sums (lower number is better)
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the l2 norm method
         """
-        topsList = self.tops.copy()  # copy it so you don't change the original tops list when tops gets changed in getMinIndexWithTops
-        totalPoints = [0] * self.numClimbers  # will store points for each climber
-        for climber in range(0, self.numClimbers):
-            sum = 0
-            for problem in range(0, self.numProblems):
-                sum += (self.ranks[climber][problem]) ** 2  # squared
-            totalPoints[climber] = sum ** (1 / 2)
-        return self.__calculateFinalRank(topsList, totalPoints)
+        totalPoints = rk.l2NormScores(self.ranks).tolist()  # l2 norm of each climber's ranks
+        return self.__calculateFinalRank(self.tops, totalPoints)
 
     def l2NormMethodNoTops(self):  # takes tops as parameter so parameters are standard
         """
@@ -202,12 +194,7 @@ class ClimbingRanker:
         rankings of each climber on each problem and rank them based on the square root of these sums (lower number is better)
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the l2 norm method
         """
-        totalPoints = [0] * self.numClimbers  # will store points for each climber
-        for climber in range(0, self.numClimbers):
-            sum = 0
-            for problem in range(0, self.numProblems):
-                sum += (self.ranks[climber][problem]) ** 2  # squared
-            totalPoints[climber] = sum ** (1 / 2)
+        totalPoints = rk.l2NormScores(self.ranks).tolist()  # l2 norm of each climber's ranks
         return self.__calculateFinalRankNoTops(totalPoints)
 
     def topScoreMethod(self):
@@ -215,29 +202,18 @@ class ClimbingRanker:
         tops, total points (1 point per handhold), flashes, attempts to top, attempts to high point
         :return: aggregated rank as calculated by Top Score method
         """
-        topsList = self.tops.copy()
-        points = self.points.copy()
-        finalNumRank = [0] * self.numClimbers  # aggregated rank where climbers are in original order and these are their places
-        finalRank = [""] * self.numClimbers  # aggregated rank of climbers
         attemptsToTop, attemptsToHighPoint = self.__separateAttempts()
         flashes = self.__getFlashes()
-        i = 0  # what place the climbers is in in the final rank
-        while (i < self.numClimbers):
-            indices = self.__getMinIndexForTopScoreMethod(points, attemptsToTop, attemptsToHighPoint, topsList, flashes)
-            j = 0
-            while (j < len(indices)):  # climbers whose indices are in indices list all tie
-                finalNumRank[indices[j]] = i + 1  # +1 because rank from 1 to numClimbers
-                finalRank[i] += self.climbers[indices[j]] + ";"
-                j += 1
-            i += len(indices)
-        # return finalRank, finalNumRank
-        return finalNumRank
+        return rk.lexicographicRank([(self.tops, "max"), (self.points, "max"), (flashes, "max"),
+                                     (attemptsToTop, "min"), (attemptsToHighPoint, "min")])
 
     def __getFlashes(self):
         """
         calculates the number of flashes for each climber (used in Top Score)
         :return: 1D list where each entry is the number of flashes of the given climber
         """
+        if(self.flashes is not None):
+            return self.flashes
         flashes = []
         for climber in range(self.numClimbers):
             count = 0
@@ -245,7 +221,8 @@ class ClimbingRanker:
                 if(self.attemptsPerProblem[climber][problem] == 1 and self.topsPerProblem[climber][problem] == 1):
                     count += 1
             flashes.append(count)
-        return flashes
+        self.flashes = flashes
+        return self.flashes
 
     def mergedOldMethod(self):
         """
@@ -254,39 +231,7 @@ class ClimbingRanker:
         then attempts to top, then attempts to high point
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the old USAC method
         """
-        topsList = self.tops.copy()  # copy it so you don't change the original tops list when tops gets changed in getMinIndexWithTops
-        holdNumbers = []  # maximum number of holds on each climb, -1 if that cannot be determined (no one topped)
-        #loop through each problem and calculates maximum number of holds on each climb
-        if(self.complete):
-            for col in range(0, len(self.topsPerProblem[0])):
-                for row in range(0, len(self.topsPerProblem)):
-                    if (self.topsPerProblem[row][col] == 1):
-                        holdNumbers.append(self.pointsPerProblem[row][col])
-                        break
-                    if (row == len(self.topsPerProblem) - 1):
-                        holdNumbers.append(-1)
-        else:
-            fullData = ClimbingRanker(self.category + "BNats" + self.round + "2016.csv")
-            tpp = fullData.topsPerProblem
-            ppp = fullData.pointsPerProblem
-            for col in range(0, len(tpp[0])):
-                for row in range(0, len(tpp)):
-                    if (tpp[row][col] == 1):
-                        holdNumbers.append(ppp[row][col])
-                        break
-                    if (row == len(tpp) - 1):
-                        holdNumbers.append(-1)
-        #if max number of holds could not be determined then take average points per climb in given category
-        averagePoints = sss.getAverageNumberOfHolds(self.category)
-        holdPointsPerProblem = []
-        #each hold is worth 1000/number of holds on problem
-        for problem in range(0, len(holdNumbers)):
-            if (holdNumbers[problem] == -1):
-                holdPointsPerProblem.append(1000 / averagePoints[1])
-            else:
-                holdPointsPerProblem.append(1000 / holdNumbers[problem])
-        finalNumRank = [0] * self.numClimbers  # aggregated rank where climbers are in original order and these are their places
-        finalRank = [""] * self.numClimbers  # aggregated rank of climbers
+        holdPointsPerProblem = self.__getHoldPointsPerProblem()
         attemptsToTop, attemptsToHighPoint = self.__separateAttempts()
         newPoints = [] #points as determined by combined old USAC methods
         for climber in range(0, self.numClimbers):
@@ -294,17 +239,8 @@ class ClimbingRanker:
             for problem in range(0, self.numProblems):
                 pointCount += self.pointsPerProblem[climber][problem] * holdPointsPerProblem[problem]
             newPoints.append(pointCount)
-        i = 0  # what place the climbers is in in the final rank
-        while (i < self.numClimbers):
-            indices = self.__getMinIndexForMergedMethod(newPoints, attemptsToTop, attemptsToHighPoint, topsList)
-            j = 0
-            while (j < len(indices)):  # climbers whose indices are in indices list all tie
-                finalNumRank[indices[j]] = i + 1  # +1 because rank from 1 to numClimbers
-                finalRank[i] += self.climbers[indices[j]] + ";"
-                j += 1
-            i += len(indices)
-        #return finalRank, finalNumRank
-        return finalNumRank
+        return rk.lexicographicRank([(self.tops, "max"), (newPoints, "max"), (attemptsToTop, "min"),
+                                     (attemptsToHighPoint, "min")])
 
     def abs10Method(self):
         """
@@ -312,38 +248,7 @@ class ClimbingRanker:
         and there is a 20 point flash bonus and -5 points for each fall
         :return: list of climbers in their final ranked order and aggregated rank as calculated by the abs10 method
         """
-        holdNumbers = []  # maximum number of holds on each climb, -1 if that cannot be determined (no one topped)
-        # loop through each problem and calculates maximum number of holds on each climb
-        if (self.complete):
-            for col in range(0, len(self.topsPerProblem[0])):
-                for row in range(0, len(self.topsPerProblem)):
-                    if (self.topsPerProblem[row][col] == 1):
-                        holdNumbers.append(self.pointsPerProblem[row][col])
-                        break
-                    if (row == len(self.topsPerProblem) - 1):
-                        holdNumbers.append(-1)
-        else: #partial dataset - we use the full data set to see if anyone topped the problem so we get hold numbers (makes it independent)
-            fullData = ClimbingRanker(self.category + "BNats" + self.round + "2016.csv")
-            tpp = fullData.topsPerProblem
-            ppp = fullData.pointsPerProblem
-            for col in range(0, len(tpp[0])):
-                for row in range(0, len(tpp)):
-                    if (tpp[row][col] == 1):
-                        holdNumbers.append(ppp[row][col])
-                        break
-                    if (row == len(tpp) - 1):
-                        holdNumbers.append(-1)
-        # if max number of holds could not be determined then take average points per climb in given category
-        averagePoints = sss.getAverageNumberOfHolds(self.category)
-        holdPointsPerProblem = []
-        # each hold is worth 1000/number of holds on problem
-        for problem in range(0, len(holdNumbers)):
-            if (holdNumbers[problem] == -1):
-                holdPointsPerProblem.append(1000 / averagePoints[1])
-            else:
-                holdPointsPerProblem.append(1000 / holdNumbers[problem])
-        finalNumRank = [0] * self.numClimbers  # aggregated rank where climbers are in original order and these are their places
-        finalRank = [""] * self.numClimbers  # aggregated rank of climbers
+        holdPointsPerProblem = self.__getHoldPointsPerProblem()
         newPoints = []  # points as determined by abs10 method
         for climber in range(0, self.numClimbers):
             pointCount = 0
@@ -353,18 +258,44 @@ class ClimbingRanker:
                     pointCount += 20  # 20 point flash bonus
                 else:
                     pointCount -= (self.attemptsPerProblem[climber][problem] - 1) * 5  # -5 for each fall
-            newPoints.append(pointCount*-1) #so that we can use getMinIndex method instead of having to find the max indices
-        i = 0  # what place the climbers is in in the final rank
-        while (i < self.numClimbers):
-            indices = self.__getMinIndex(newPoints)
-            j = 0
-            while (j < len(indices)):  # climbers whose indices are in indices list all tie
-                finalNumRank[indices[j]] = i + 1  # +1 because rank from 1 to numClimbers
-                finalRank[i] += self.climbers[indices[j]] + ";"
-                j += 1
-            i += len(indices)
-        # return finalRank, finalNumRank
-        return finalNumRank
+            newPoints.append(pointCount)
+        return rk.lexicographicRank([(newPoints, "max")])
+
+    def __getHoldPointsPerProblem(self):
+        """
+        calculates how many points each hold is worth on each problem (1000/{total number of holds on climb}) for the
+        abs10 and merged methods. calculated once per ranker and saved in self.holdPointsPerProblem
+        :return: 1D list where each entry is the value of one hold on that problem
+        """
+        if(self.holdPointsPerProblem is not None):
+            return self.holdPointsPerProblem
+        if(self.complete):
+            tpp = self.topsPerProblem
+            ppp = self.pointsPerProblem
+        else: #partial dataset - we use the full data set to see if anyone topped the problem so we get hold numbers (makes it independent)
+            fullFileName = self.category + "BNats" + self.round + "2016.csv"
+            tpp = dc.getTopsPerProblem(fullFileName)
+            ppp = dc.getDataFile(fullFileName).getPointsPerProblem()
+        holdNumbers = []  # maximum number of holds on each climb, -1 if that cannot be determined (no one topped)
+        # loop through each problem and calculates maximum number of holds on each climb
+        for col in range(0, len(tpp[0])):
+            for row in range(0, len(tpp)):
+                if (tpp[row][col] == 1):
+                    holdNumbers.append(ppp[row][col])
+                    break
+                if (row == len(tpp) - 1):
+                    holdNumbers.append(-1)
+        holdPointsPerProblem = []
+        # each hold is worth 1000/number of holds on problem
+        for problem in range(0, len(holdNumbers)):
+            if (holdNumbers[problem] == -1):
+                # if max number of holds could not be determined then take average points per climb in given category
+                averagePoints = sss.getAverageNumberOfHolds(self.category)
+                holdPointsPerProblem.append(1000 / averagePoints[1])
+            else:
+                holdPointsPerProblem.append(1000 / holdNumbers[problem])
+        self.holdPointsPerProblem = holdPointsPerProblem
+        return self.holdPointsPerProblem
 
     def __calculateFinalRank(self, tops, totalPoints):
         """
@@ -375,19 +306,7 @@ class ClimbingRanker:
         climber has
         :return: a 1D list where each entry is the final rank of that climber
         """
-        finalNumRank = [0] * self.numClimbers  # aggregated rank where climbers are listed in original order and these are their places
-        finalRank = [""] * self.numClimbers  # aggregated rank
-        i = 0  # what place the climber is in in the final rank
-        while (i < self.numClimbers):
-            indices = self.__getMinIndexWithTops(totalPoints, tops)
-            j = 0
-            while (j < len(indices)):  # climbers whose indices are in indices list all tie
-                finalNumRank[indices[j]] = i + 1  # +1 because rank from 1 to numClimbers
-                finalRank[i] += self.climbers[indices[j]] + ";"
-                j += 1
-            i += len(indices)
-        #return finalRank, finalNumRank
-        return finalNumRank
+        return rk.lexicographicRank([(tops, "max"), (totalPoints, "min")])
 
     def __calculateFinalRankNoTops(self, totalPoints):  # lower number of points means higher rank
         """
@@ -396,135 +315,15 @@ class ClimbingRanker:
         climber has
         :return: a 1D list where each entry is the final rank of that climber
         """
-        finalNumRank = [0] * self.numClimbers  # aggregated rank where climbers are listed in original order and these are their places
-        finalRank = [""] * self.numClimbers  # aggregated rank
-        i = 0  # what place the climber is in in the final rank
-        while (i < self.numClimbers):
-            indices = self.__getMinIndex(totalPoints)
-            j = 0
-            while (j < len(indices)):  # climbers whose indices are in indices list all tie
-                finalNumRank[indices[j]] = i + 1  # +1 because rank from 1 to numClimbers
-                finalRank[i] += self.climbers[indices[j]] + ";"
-                j += 1
-            i += len(indices)
-        #return finalRank, finalNumRank
-        return finalNumRank
-
-    def __getMinIndexForMergedMethod(self, points, attemptsToTop, attemptsToHighPoint, tops):
-        """
-        Finds the indices of the climbers who have the most tops, most points, fewest attempts to top, and fewest
-        attempts to high point and then returns those indices and sets them to -1 if we maximize and 1000 if we minimize
-        :param points: 1D list with points (for merged method) for each climber
-        :param attemptsToTop: 1D list with number of attempts to top for each climber
-        :param attemptsToHighPoint: 1D list with number of attempts to high point (not top although it
-        doesn't matter because if its used, climbers have equal numbers of attempts to top) for each climber
-        :param tops: 1D list where each entry is the total number of tops for that climber
-        :return: indices fo climbers with the most tops, most points, fewest attempts to top, and fewest
-        attempts to high point
-        """
-        # find the maximum number of tops and if there are multiple climbers with that number of tops
-        max = [0]  # stores indices of maximum values
-        for i in range(1, len(tops)):
-            if (tops[i] > tops[max[0]]):
-                max = [i]
-            elif (tops[i] == tops[max[0]]):
-                max.append(i)
-        maxPointIndices = [max[0]]  # index of climber(s) with maximum point value
-        if (len(max) > 1):  # out of the climbers with maximum number of tops find one with fewest points
-            for index in max:
-                if (points[index] > points[maxPointIndices[0]]):
-                    maxPointIndices = [index]
-                elif (points[index] == points[maxPointIndices[0]] and index != maxPointIndices[
-                    0]):  # two climbers have same points & same tops
-                    maxPointIndices.append(index)
-        minAttemptsToTopIndices = [maxPointIndices[0]]
-        if (len(maxPointIndices) > 1):  # out of the climbers with the same number of tops and points find the one with the fewest attempts to top
-            for index in maxPointIndices:
-                if (attemptsToTop[index] < attemptsToTop[minAttemptsToTopIndices[0]]):
-                    minAttemptsToTopIndices = [index]
-                elif (attemptsToTop[index] == attemptsToTop[minAttemptsToTopIndices[0]] and index !=
-                    minAttemptsToTopIndices[0]):  # two climbers have same points & same tops
-                    minAttemptsToTopIndices.append(index)
-        minAttemptsToHPIndices = [minAttemptsToTopIndices[0]]
-        if (len(minAttemptsToTopIndices) > 1):  # out of the climbers with the same number of tops and points and attempts to top find the one with the fewest attempts to high point
-            for index in minAttemptsToTopIndices:
-                if (attemptsToHighPoint[index] < attemptsToHighPoint[minAttemptsToHPIndices[0]]):
-                    minAttemptsToHPIndices = [index]
-                elif (attemptsToHighPoint[index] == attemptsToHighPoint[minAttemptsToHPIndices[0]] and index !=
-                    minAttemptsToHPIndices[0]):  # two climbers have same points & same tops
-                    minAttemptsToHPIndices.append(index)
-        # now get rid of maximum point value and that climber's score in tops list
-        for index in minAttemptsToHPIndices:
-            points[index] = -1  # since looking for biggest value, make it small so we don't hit it again
-            tops[index] = -1  # since looking for highest number of tops, make it small so we don't hit it again
-            attemptsToTop[index] = 100  # since looking for the smallest number of attempts, make it big so we don't hit it again
-            attemptsToHighPoint[index] = 100  # since we are looking for the smallest number of attempts, make it big so we don't hit it again
-        return minAttemptsToHPIndices
-
-    def __getMinIndexForTopScoreMethod(self, points, attemptsToTop, attemptsToHighPoint, tops, flashes):
-        """
-        Finds the indices of the climbers with the most tops, the most points, the most flashes, the fewest attempts to
-        top, and the fewest attempts to high point and then returns those indices and sets them to -1 if we maximize
-        and 1000 if we minimize
-        :param points: 1D list where each entry is the total number of holds that climber reached (copy of self.points)
-        :param attemptsToTop: 1D list where each entry is the number of attempts to top the climber had
-        :param attemptsToHighPoint: 1D list where each entry is the number of attempts to high point the climber had
-        (total attempts - attempts to top)
-        :param tops: 1D list where each entry is the total number of tops the climber had
-        :param flashes: 1D list where each entry is the total number of flashes the climber had
-        :return: the indices of the climbers with the most tops, the most points, the most flashes, the fewest attempts to
-        top, and the fewest attempts to high point
-        """
-        # find the maximum number of tops and if there are multiple climbers with that number of tops
-        max = [0]  # stores indices of maximum values
-        for i in range(1, len(tops)):
-            if (tops[i] > tops[max[0]]):
-                max = [i]
-            elif (tops[i] == tops[max[0]]):
-                max.append(i)
-        maxPointIndices = [max[0]]  # index of climber(s) with maximum tops
-        if (len(max)>1):  # out of the climbers with maximum number of tops find one with fewest points
-            for index in max:
-                if (points[index] > points[maxPointIndices[0]]):
-                    maxPointIndices = [index]
-                elif (points[index] == points[maxPointIndices[0]] and index != maxPointIndices[0]):  # two climbers have same points & same tops
-                    maxPointIndices.append(index)
-        maxFlashesIndices = [maxPointIndices[0]]
-        if(len(maxPointIndices)>1):
-            for index in maxPointIndices:
-                if (flashes[index] > flashes[maxFlashesIndices[0]]):
-                    maxFlashesIndices = [index]
-                elif (flashes[index] == flashes[maxFlashesIndices[0]] and index != maxFlashesIndices[0]):  # two climbers have same points & same tops
-                    maxFlashesIndices.append(index)
-        minAttemptsToTopIndices = [maxFlashesIndices[0]]
-        if (len(maxFlashesIndices) > 1):  # out of the climbers with the same number of tops and points find the one with the fewest attempts to top
-            for index in maxPointIndices:
-                if (attemptsToTop[index] < attemptsToTop[minAttemptsToTopIndices[0]]):
-                    minAttemptsToTopIndices = [index]
-                elif (attemptsToTop[index] == attemptsToTop[minAttemptsToTopIndices[0]] and index != minAttemptsToTopIndices[0]):  # two climbers have same points & same tops
-                    minAttemptsToTopIndices.append(index)
-        minAttemptsToHPIndices = [minAttemptsToTopIndices[0]]
-        if (len(minAttemptsToTopIndices) > 1):  # out of the climbers with the same number of tops and points and attempts to top find the one with the fewest attempts to high point
-            for index in minAttemptsToTopIndices:
-                if (attemptsToHighPoint[index] < attemptsToHighPoint[minAttemptsToHPIndices[0]]):
-                    minAttemptsToHPIndices = [index]
-                elif (attemptsToHighPoint[index] == attemptsToHighPoint[minAttemptsToHPIndices[0]] and index !=
-                    minAttemptsToHPIndices[0]):  # two climbers have same points & same tops
-                    minAttemptsToHPIndices.append(index)
-        # now get rid of maximum point value and that climber's score in tops list
-        for index in minAttemptsToHPIndices:
-            points[index] = -1  # since looking for biggest value, make it small so we don't hit it again
-            flashes[index] = -1 #since we are looking for largest number, make it small so we don't hit it again
-            tops[index] = -1  # since looking for highest number of tops, make it small so we don't hit it again
-            attemptsToTop[index] = 100  # since looking for the smallest number of attempts, make it big so we don't hit it again
-            attemptsToHighPoint[index] = 100  # since we are looking for the smallest number of attempts, make it big so we don't hit it again
-        return minAttemptsToHPIndices
+        return rk.lexicographicRank([(totalPoints, "min")])
 
     def __separateAttempts(self):
         """
         separates attempts matrix into list of total attempts to top and list of total attempts to high point
         :return: 1D list of attempts to top and 1D list of attempts to high point
         """
+        if(self.attemptSplit is not None):
+            return self.attemptSplit
         attemptsToTop = [0] * self.numClimbers
         attemptsToHighPoint = [0] * self.numClimbers
         for climber in range(0, self.numClimbers):
@@ -537,83 +336,19 @@ class ClimbingRanker:
                     hpSum += self.attemptsPerProblem[climber][problem]
             attemptsToTop[climber] = topSum
             attemptsToHighPoint[climber] = hpSum
-        return attemptsToTop, attemptsToHighPoint
-
-    def __getMinIndex(self, list):
-        """
-        returns the indices of the minimum value in a list and changes the min values to 1000
-        :param list: list where minimum value will be found
-        :return: indices in list with that minimum value
-        """
-        minIndex = [0]
-        for i in range(1, len(list)):
-            if (list[i] < list[minIndex[0]]):
-                minIndex = [i]
-            elif (list[i] == list[minIndex[0]]):
-                minIndex.append(i)
-        for index in minIndex:
-            list[index] = 1000  # 100 wasn't big enough - beware
-        return minIndex
-
-    def __getMinIndexWithTops(self, list, tops):
-        """
-        Finds the indices of climbers with the highest number of tops and lowest number of points (in list) and then
-        sets those indices in tops to -1 and in list to 1000
-        :param list: 1D list of points for each climber (given by some method)
-        :param tops: 1D list with total number of tops for each climber
-        :return: indices of climbers with the highest number of tops and lowest number of points (in list)
-        """
-        # find the maximum number of tops and if there are multiple climbers with that number of tops
-        count = 1
-        max = [0]  # stores indices of maximum values
-        for i in range(1, len(tops)):
-            if (tops[i] > tops[max[0]]):
-                max = [i]
-                count = 1
-            elif (tops[i] == tops[max[0]]):
-                count += 1
-                max.append(i)
-        minPointIndices = [max[0]]  # index of climber(s) with minimum point value
-        if (count > 1):  # out of the climbers with maximum number of tops find one with fewest points
-            for index in max:
-                if (list[index] < list[minPointIndices[0]]):
-                    minPointIndices = [index]
-                elif (list[index] == list[minPointIndices[0]] and index != minPointIndices[
-                    0]):  # two climbers have same points & same tops
-                    minPointIndices.append(index)
-        # now get rid of maximum point value and that climber's score in tops list
-        for index in minPointIndices:
-            list[index] = 100  # since looking for smallest value, make it big so we don't hit it again
-            tops[index] = -1  # since looking for highest number of tops, make it small so we don't hit it again
-        return minPointIndices
+        self.attemptSplit = (attemptsToTop, attemptsToHighPoint)
+        return self.attemptSplit
 
     def __getUSAClimbingRankingPoints(self):
         """
         Takes self.ranks and assigns tied climbers a rank equal to that of their tied places (how ties are generally
-        handled in ranking methods)
-        :return: 2D list similar to self.ranks
-        """
-        ranks = copy.deepcopy(self.ranks)
-        for col in range(0, len(self.ranks[0])):  # loops through each problem
-            rank = 1
-            while (rank < len(self.ranks) + 1):  # loops through each possible rank on problem
-                indices = []  # hold the indices in rankings that have that particular rank
-                for row in range(0, len(self.ranks)):  # loops through each climber for that problem
-                    if (ranks[row][col] == rank):  # if that climber got that rank on the problem
-                        indices.append(row)  # add that index to the indices list
-                if (len(
-                        indices) > 1):  # if the indices list is larger than 1, change all the appropriate values in rank so that they are the average rank
-                    i = 0
-                    sum = 0
-                    while (i < len(indices)):
-                        sum += rank + i
-                        i += 1
-                    newRank = sum / len(indices)
-                    for i in indices:
-                        ranks[i][col] = newRank
-                    rank += len(indices) - 1
-                rank += 1
-        return ranks
+        handled in ranking methods). calculated once per ranker and saved in self.usacRankingPoints
+        :return: numpy matrix similar to self.ranks
+        """
+        if(self.usacRankingPoints is None):
+            self.usacRankingPoints = rk.averageTiedRanks(self.ranks)
+            self.usacRankingPoints.setflags(write=False) #shared by every method that uses it
+        return self.usacRankingPoints
 
     def __flipRankings(self):  # flips rankings so rows represent each complete rank
         """
@@ -628,80 +363,19 @@ class ClimbingRanker:
 
     def __wAlgorithm(self):
         """
-        uses weiszfeld's algorithm to calculate the geometric median of the ranks (in Euclidean space)
+        uses weiszfeld's algorithm to calculate the geometric median of the ranks (in Euclidean space), using
+        self.weiszfeldTolerance and self.weiszfeldMaxIterations. saves the number of iterations done and the residual
+        (distance moved in the last iteration) in self.weiszfeldIterations and self.weiszfeldResidual
         :return: point generated by weiszfeld's algorithm (rating, not a rank)
         """
-        numClimbers = len(self.ranks)
-        numProblems = len(self.ranks[0])
-        # calculate initial rank: centroid
-        finalRank = [0] * numClimbers
-        for i in range(0, numClimbers):
-            sum = 0
-            for m in range(0, numProblems):
-                sum += self.flippedRanks[m][i]
-            finalRank[i] = sum / numProblems
-        # calculate next final rank
-        newRank = self.__calculateNextFinalRank(finalRank)
-        while (bd.euclideanDistance(finalRank, newRank) > .1):
-            finalRank = newRank
-            newRank = self.__calculateNextFinalRank(finalRank)
-        return newRank
-
-    def __calculateNextFinalRank(self, finalRank):
-        """
-        Calculates the next aggregated rank according to weiszfeld's algorithm (next approximation)
-        :param finalRank: current approximation
-        :return: next approximation
-        """
-        sum = [0] * self.numClimbers
-        sum2 = 0
-        for i in range(0, self.numProblems):
-            d = bd.euclideanDistance(finalRank, self.flippedRanks[i])
-            if (d == 0):
-                raise ZeroDivisionError("landed on one of the points: ", finalRank)
-            sum = self.__listAdd(sum, self.__listDivide(self.flippedRanks[i], d))
-            sum2 += 1 / d
-        newRank = self.__listDivide(sum, sum2)
-        return newRank
-
-    def __listDivide(self, list, num):
-        """
-        divides every element in list by num
-        :param list: 1D list of numbers
-        :param num: number that list will be divided by
-        :return: new list where newList_i = list_i/num
-        """
-        newList = [0] * len(list)
-        for i in range(0, len(list)):
-            newList[i] = list[i] / num
-        return newList
-
-    def __listAdd(self, listA, listB):
-        """
-        adds elements in listA and listB to create a new list
-        :param listA: first list to be added
-        :param listB: second list to be added
-        :return: new list where listC_i = listA_i+listB_i
-        """
-        if (len(listA) == len(listB)):
-            listC = [0] * len(listA)
-            for i in range(0, len(listA)):
-                listC[i] = listA[i] + listB[i]
-            return listC
-        else:
-            raise Exception("lengths don't match, cannot add")
-
-    def __calcSum(self, finalRank, method):
-        """
-        Calculates the sum of distances from finalRank to each rank in the ranks matrix using the given distance
-        :param finalRank: aggregated rank
-        :param method: which distance to use
-        :return: the sum of the distances from finalRank to each of the ranks in self.ranks
-        """
-        sum = 0
-        for rank in self.flippedRanks:
-            sum += method(finalRank, rank)
-        return sum
+        settings = (self.weiszfeldTolerance, self.weiszfeldMaxIterations)
+        if(self.weiszfeldRating is not None and self.weiszfeldSettings == settings):
+            return self.weiszfeldRating
+        rating, self.weiszfeldIterations, self.weiszfeldResidual = rk.weiszfeld(self.flippedRanks, *settings)
+        rating.setflags(write=False) #shared by every method that uses it
+        self.weiszfeldRating = rating
+        self.weiszfeldSettings = settings
+        return self.weiszfeldRating
 
     def wAlgorithmInteger(self):  # turns algorithm output into optimal rank based solely on ordering of values
         """
@@ -710,140 +384,70 @@ class ClimbingRanker:
         :return: the rank
         """
         finalRank = self.__wAlgorithm()
-        return self.__getIntegerRanks(finalRank, 0)
+        return rk.thresholdRanks(finalRank, [0], self.tops)[0].tolist()
 
-    def __sort(self, finalRankAndIndices, threshold):
-        finalRankSorted = []
-        for i in range(0, len(finalRankAndIndices)):
-            finalRankAndIndices[i].append(0)
-            finalRankSorted.append(finalRankAndIndices[i])
-        #do insertion sort on ratings
-        for i in range(1, len(finalRankSorted)):
-            j = i
-            while (j > 0 and finalRankSorted[j][0] < finalRankSorted[j - 1][0]):
-                temp = finalRankSorted[j]
-                finalRankSorted[j] = finalRankSorted[j - 1]
-                finalRankSorted[j - 1] = temp
-                j -= 1
-        # add places to finalRankSorted
-        finalRankSorted[0][2] = 1
-        count = 1
-        for i in range(1, len(finalRankSorted)):
-            if (finalRankSorted[i][0] - finalRankSorted[i - 1][0] <= threshold):  # tie
-                finalRankSorted[i][2] = finalRankSorted[i - 1][2]
-                count += 1
-            else:
-                finalRankSorted[i][2] = finalRankSorted[i - 1][2] + count
-                count = 1
-        return finalRankSorted
+    def __getOptimalThresholdRank(self, thresholds, tops):
+        """
+        turns the weiszfeld rating into a rank for every tie threshold (the rating is only sorted once) and returns the
+        rank with the smallest sum of euclidean distances to the ranks (the first one if more than one is optimal)
+        :param thresholds: 1D list of tie thresholds to try
+        :param tops: 1D list of total tops for each climber, or None to ignore tops
+        :return: the optimal rank
+        """
+        finalRank = self.__wAlgorithm()
+        testRanks = rk.thresholdRanks(finalRank, thresholds, tops)
+        testSums = rk.euclideanDistanceSums(testRanks, self.flippedRanks)
+        return testRanks[np.argmin(testSums)].tolist()
 
-    def __sortWithTops(self, finalRankAndIndices, threshold):
-        """
-        Sorts finalRankAndIndices and adds an extra element to each sublist that has final rank
-        :param finalRankAndIndices: 2-d list where each sublist is the rating output by weizsfel'ds algorithm
-        followed by the index of the rating (indices are in order for this list, used to keep track during sorting)
-        :param threshold: if two ratings are within threshold of eachother, the climbers tie
-        :return: finalRankSorted, which is a 2-d list with each sublist having the rating output by weiszfeld's algorithm,
-        the index of the rating (which climber it goes with) and the final place of that climber
-        """
-        finalRankSorted = []
-        for i in range(0,len(finalRankAndIndices)):
-            finalRankAndIndices[i].append(0)
-            finalRankSorted.append(finalRankAndIndices[i])
-        for i in range(1, len(finalRankSorted)): #insertion sort
-            j = i
-            while (j > 0 and
-                       ((finalRankSorted[j][0] < finalRankSorted[j - 1][0] and self.tops[finalRankSorted[j][1]] ==
-                           self.tops[finalRankSorted[j - 1][1]])
-                        or self.tops[finalRankSorted[j][1]] > self.tops[finalRankSorted[j - 1][1]])):
-                #swap j and j-1
-                temp = finalRankSorted[j]
-                finalRankSorted[j] = finalRankSorted[j - 1]
-                finalRankSorted[j - 1] = temp
-                j -= 1
-        # add places to finalRankSorted
-        finalRankSorted[0][2] = 1
-        count = 1
-        for i in range(1, len(finalRankSorted)):
-            if(finalRankSorted[i][0]-finalRankSorted[i-1][0]<=threshold and self.tops[finalRankSorted[i][1]] ==
-                           self.tops[finalRankSorted[i - 1][1]]): #tie
-                finalRankSorted[i][2] = finalRankSorted[i-1][2]
-                count+=1
-            else:
-                finalRankSorted[i][2] = finalRankSorted[i-1][2] + count
-                count = 1
-        return finalRankSorted
+    def wAlgorithmNoTops(self, thresholds=None):
+        """
+        Performs weiszfeld's algorithm to get a rating of the different climbers and then returns the optimal ranking
+        of those climbers ignoring tops (tests different tie thresholds)
+        :param thresholds: optional - tie thresholds to try (default self.weiszfeldThresholds: 0, .1, ..., .5)
+        :return: the optimal rank
+        """
+        if(thresholds is None):
+            thresholds = self.weiszfeldThresholds
+        return self.__getOptimalThresholdRank(thresholds, None)
 
-    def __getIntegerRanks(self, finalRank, threshold):
-        """
-        turns the weiszfeld ratings into a rank, where climbers tie if their ratings are within threshold of eachother
-        :param finalRank:rating from Weiszfeld's algorithm
-        :param threshold: if two ratings are within this distance, the climbers tie
-        :return: the final rank of the climbers
-        """
-        finalRankAndIndices = []
-        for index in range(len(finalRank)):
-            finalRankAndIndices.append([finalRank[index], index])
-        finalRankAndIndicesSorted = self.__sortWithTops(finalRankAndIndices, threshold)
-        integerRank = [0]*len(finalRank)
-        for i in range(0, len(finalRankAndIndicesSorted)):
-            integerRank[finalRankAndIndicesSorted[i][1]] = finalRankAndIndicesSorted[i][2]
-        return integerRank
+    def wAlgorithmOptimalInteger(self, thresholds=None):
+        """
+        Performs weiszfeld's algorithm to get a rating of the different climbers and then returns the optimal ranking
+        of those climbers (tests different tie thresholds)
+        :param thresholds: optional - tie thresholds to try (default self.weiszfeldThresholds: 0, .1, ..., .5)
+        :return: the optimal rank
+        """
+        if(thresholds is None):
+            thresholds = self.weiszfeldThresholds
+        return self.__getOptimalThresholdRank(thresholds, self.tops)
 
-    def __getIntegerRanksNoTops(self, finalRank, threshold):
-        """
-        turns the weiszfeld ratings into a rank, where climbers tie if their ratings are within threshold of eachother
-        :param finalRank:rating from Weiszfeld's algorithm
-        :param threshold: if two ratings are within this distance, the climbers tie
-        :return: the final rank of the climbers
-        """
-        finalRankAndIndices = []
-        for index in range(len(finalRank)):
-            finalRankAndIndices.append([finalRank[index], index])
-        finalRankAndIndicesSorted = self.__sort(finalRankAndIndices, threshold)
-        integerRank = [0] * len(finalRank)
-        for i in range(0, len(finalRankAndIndicesSorted)):
-            integerRank[finalRankAndIndicesSorted[i][1]] = finalRankAndIndicesSorted[i][2]
-        return integerRank
+    def getPrecedenceCounts(self):
+        """
+        counts for each pair of climbers how many problems ranked one above the other (calculated once per ranker and
+        shared by the linear programming, local kemenization and distance calculations)
+        :return: wins (numpy matrix where wins[i][j] is the number of problems where i is ranked above j) and ties (numpy
+        matrix where ties[i][j] is the number of problems where i and j tie)
+        """
+        if(self.pairwiseWins is None):
+            self.pairwiseWins, self.pairwiseTies = rk.precedenceCounts(self.ranks)
+            self.pairwiseWins.setflags(write=False)
+            self.pairwiseTies.setflags(write=False)
+        return self.pairwiseWins, self.pairwiseTies
 
-    def wAlgorithmNoTops(self):
-        finalRank = self.__wAlgorithm()
-        optimalRank = self.__getIntegerRanksNoTops(finalRank, 0) #will be updated if a different threshold produces a more optimal rank
-        optimalSum = self.__calcSum(optimalRank, bd.euclideanDistance)  # will be updated to reflect the distance sum from optimalRank
-        optimalThreshold = 0  # updated when a new threshold produces an optimal ranking
-        threshold = .1
-        while (threshold <= .5):
-            testRank = self.__getIntegerRanksNoTops(finalRank, threshold)
-            testSum = self.__calcSum(testRank, bd.euclideanDistance)
-            if (testSum < optimalSum):  # testRank is more optimal than optimalRank
-                optimalRank = testRank
-                optimalSum = testSum
-                optimalThreshold = threshold
-            threshold += .1
-        # return optimalRank, optimalThreshold
-        return optimalRank
+    def getPrecedenceMatrix(self):
+        """
+        :return: numpy matrix where entry (i,j) is (# of problems with i above j) - (# of problems with j above i)
+        """
+        wins = self.getPrecedenceCounts()[0]
+        return wins - wins.T
 
-    def wAlgorithmOptimalInteger(self):
+    def __kemenyDistanceSum(self, finalRank):
         """
-        Performs weiszfeld's algorithm to get a rating of the different climbers and then returns the optimal ranking
-        of those climbers (tests different tie thresholds between 0 and .5)
-        :return: the optimal rank
+        :param finalRank: aggregated rank
+        :return: the sum of the distances (BubbleDistance.d) from finalRank to each of the ranks in self.ranks
         """
-        finalRank = self.__wAlgorithm()
-        optimalRank = self.__getIntegerRanks(finalRank, 0)  # will be updated if a different threshold produces a more optimal rank
-        optimalSum = self.__calcSum(optimalRank, bd.euclideanDistance)  # will be updated to reflect the distance sum from optimalRank
-        optimalThreshold = 0  # updated when a new threshold produces an optimal ranking
-        threshold = .1
-        while (threshold <= .5):
-            testRank = self.__getIntegerRanks(finalRank, threshold)
-            testSum = self.__calcSum(testRank, bd.euclideanDistance)
-            if (testSum < optimalSum):  # testRank is more optimal than optimalRank
-                optimalRank = testRank
-                optimalSum = testSum
-                optimalThreshold = threshold
-            threshold += .1
-        #return optimalRank, optimalThreshold
-        return optimalRank
+        wins, ties = self.getPrecedenceCounts()
+        return rk.kemenyDistanceSum(finalRank, wins, ties)
 
     def linearProgrammingOptimal(self):
         """
@@ -854,7 +458,8 @@ class ClimbingRanker:
         basically trying to minimize pairwise disagreements between final rank
         and each ranking (but not the same as minimizing the bubble distance between final rank and each ranking)
         """
-        return lp.optimize(self.ranks, self.climbers, self.tops)[0]
+        return lp.optimize(self.ranks, self.climbers, self.tops, self.getPrecedenceMatrix(), self.lpLazyCuts,
+                           self.lpDecompose)[0]
 
     def linearProgrammingOptimalSplit(self):
         """
@@ -867,146 +472,166 @@ class ClimbingRanker:
         basically trying to minimize pairwise disagreements between final rank
         and each ranking (but not the same as minimizing the bubble distance between final rank and each ranking)
         """
-        return lp.optimizeSplit(self.ranks, self.climbers, self.tops)[0]
-
-    def locallyKemenize(self, method):
+        return lp.optimizeSplit(self.ranks, self.climbers, self.tops, self.getPrecedenceMatrix(), self.lpLazyCuts,
+                                self.lpDecompose, self.lpExecutor, self.lpMaxWorkers)[0]
+
+    def kwikSortMethod(self, seed=None, restarts=None):
+        """
+        approximately minimizes the sum of the distances (BubbleDistance.d) to the ranks on every problem, for fields too
+        big for the linear program. climbers with more tops are always ranked first, and each set of climbers with the
+        same number of tops is ordered by picking the best of several randomized KwikSort orders
+        (RankingKernels.kwikSortOrder) and then moving climbers to better places in the order
+        (ExactKemeny.insertionLocalSearch). both only use the pair costs from the cached precedence counts
+        :param seed: optional - seed for the random pivots (default self.kwikSortSeed)
+        :param restarts: optional - number of KwikSort orders to pick the best of (default self.kwikSortRestarts)
+        :return: the final rank (no ties)
+        """
+        if(seed is None):
+            seed = self.kwikSortSeed
+        if(restarts is None):
+            restarts = self.kwikSortRestarts
+        aheadCost = self.__getKemenyPairCosts()[0]
+        rng = np.random.default_rng(seed)
+        tops = np.asarray(self.tops)
+        finalRank = [0]*self.numClimbers
+        place = 1
+        for numTops in sorted(set(self.tops), reverse=True): #more tops ranks first
+            group = np.flatnonzero(tops == numTops)
+            cost = aheadCost[np.ix_(group, group)]
+            bestOrder = None
+            bestCost = np.inf
+            for restart in range(0, max(restarts, 1)):
+                order = rk.kwikSortOrder(cost, rng)
+                orderCost = ek.orderCost(cost, order)
+                if(orderCost < bestCost):
+                    bestOrder = order
+                    bestCost = orderCost
+            for index in ek.insertionLocalSearch(cost, bestOrder):
+                finalRank[group[index]] = place
+                place += 1
+        return finalRank
+
+    def locallyKemenize(self, method, maxPasses=None):
         """
         Given a final ranking and a set of rankings that that final ranking aggregated,
         determines if there are any swaps that can be made in ranking (switch places i and i+1 or
         make climbers in i and i+1 places both in ith place)
-        to get a better final ranking. Current method saves optimal ranking as it goes down list
-        of places in goodTestRank variable. If the new testRank is better than the old one, goodTestRank
-        is updated and goodSum becomes testSum and goodRankedClimbers is altered to match the goodTestRank.
-        When it encounters a tie in the i+1 place, the climber
-        in place i is tested swapping with all climbers tied for i+1 (until a better rank is found).
-        when it encounters a tie in the ith place, each climber tied for that place is tested as being
-        in the i+1 place (until a better rank is found). Once the end of the list is reached, if changes
-        have been made, then goodTestRank becomes finalRank and goodRankedClimbers becomes rankedClimbers
-        and we go through again and see if any changes can be made
+        to get a better final ranking. Each pass goes down the list of places and saves the best move it finds
+        (see __localKemenyPass). If a move was better than finalRank, it is made and another pass is done, until no
+        move is better or maxPasses passes have been made. The number of passes is saved in self.kemenizePasses
         :param method: method whose produced aggregated rank will be locally kemenized
+        :param maxPasses: optional - most passes that will be made (default self.kemenizeMaxPasses, None = no limit)
         :return: locally kemenized rank
         """
-        return self.__locallyKemenize(method(), self.ranks, self.tops, self.climbers, False)
+        return self.__locallyKemenize(method(), maxPasses)
 
-    def __locallyKemenize(self, finalRank, rankings, tops, climbers, recursion):
+    def __getKemenyPairCosts(self):
         """
-        Given a final ranking and a set of rankings that that final ranking aggregated,
-        determines if there are any swaps that can be made in ranking (switch places i and i+1 or
-        make climbers in i and i+1 places both in ith place)
-        to get a better final ranking. Current method saves optimal ranking as it goes down list
-        of places in goodTestRank variable. If the new testRank is better than the old one, goodTestRank
-        is updated and goodSum becomes testSum and goodRankedClimbers is altered to match the goodTestRank.
-        When it encounters a tie in the i+1 place, the climber
-        in place i is tested swapping with all climbers tied for i+1 (until a better rank is found).
-        when it encounters a tie in the ith place, each climber tied for that place is tested as being
-        in the i+1 place (until a better rank is found). Once the end of the list is reached, if changes
-        have been made, then goodTestRank becomes finalRank and goodRankedClimbers becomes rankedClimbers
-        and we go through again and see if any changes can be made
-        :param finalRank: 1D list of rank for each climber (given by some rank aggregation method)
-        :param rankings: 2D list of rankings where each row is the rank on each problem for a given climber
-        :param tops: 1D list of total number of tops for each climber
-        :param rankedClimbers: 1D list that has climbers' names in order of their finalRank
-        :param climbers: 1D list that has climbers' names in the order they are in the data (how tops and ranks are kept track of)
-        :param recursion: true if this time through was a recursive call, always false when you call the method yourself
-        :return: locally kemenized ranking from finalRank and also updates rankedClimbers so there is an accurate list of
-        climbers in the order of their final rank
+        :return: aheadCost and tiedCost matrices for the ranks (see RankingKernels.kemenyPairCosts)
         """
+        if(self.kemenyPairCosts is None):
+            wins, ties = self.getPrecedenceCounts()
+            self.kemenyPairCosts = rk.kemenyPairCosts(wins, ties)
+        return self.kemenyPairCosts
 
-        # flip rankings so rows represent each complete rank
-        # ranks = [[0]*len(rankings[0])]*len(rankings) doesn't work because multiplication only does shallow copy
-        if (recursion == False):
-            ranks = np.zeros(shape=(len(rankings[0]), len(rankings)))
-            for row in range(0, len(ranks)):
-                for col in range(0, len(ranks[0])):
-                    ranks[row][col] = rankings[col][row]
-        else:
-            ranks = rankings
-        sum = self.__calcSum(finalRank, bd.d)  # measure of how good this current finalRank is
-        i = 1  # will use to iterate through places climbers could be in in their finalRank
-        better = False  # true if there is a better rank than finalRank
-        goodTestRank = finalRank.copy()  # will save ranks that are more optimal than finalRank
+    def __locallyKemenize(self, finalRank, maxPasses=None):
+        """
+        locally kemenizes finalRank one pass at a time (iteratively, so long lists of improving passes don't hit the
+        recursion limit)
+        :param finalRank: 1D list of rank for each climber (given by some rank aggregation method)
+        :param maxPasses: optional - most passes that will be made (default self.kemenizeMaxPasses, None = no limit)
+        :return: locally kemenized ranking from finalRank
+        """
+        if(maxPasses is None):
+            maxPasses = self.kemenizeMaxPasses
+        sum = self.__kemenyDistanceSum(finalRank)  # measure of how good this current finalRank is
+        passes = 0
+        while(maxPasses is None or passes < maxPasses):
+            passes += 1
+            betterRank, sum = self.__localKemenyPass(finalRank, sum)
+            if(betterRank is None): #no move is better than finalRank
+                break
+            finalRank = betterRank
+        self.kemenizePasses = passes
+        return finalRank
+
+    def __localKemenyPass(self, finalRank, sum):
+        """
+        makes one pass down the list of places in finalRank looking for the best move. If the new testRank is better
+        than the best one so far, it is saved and goodSum becomes testSum. When it encounters a tie in the i+1 place,
+        the climber in place i is tested swapping with all climbers tied for i+1. When it encounters a tie in the ith
+        place, each climber tied for that place is tested as being in the last place of the tie (until a better rank is
+        found). Climbers with different numbers of tops are never switched.
+        A move only changes the order of the climbers it moves, so each testSum is sum plus the change in cost of those
+        pairs (see RankingKernels.kemenyPairCosts) instead of being calculated from scratch
+        :param finalRank: 1D list of rank for each climber
+        :param sum: sum of the distances from finalRank to the ranks on each problem
+        :return: best rank found (None if no move is better than finalRank) and its sum
+        """
+        aheadCost, tiedCost = self.__getKemenyPairCosts()
+        n = len(finalRank)
+        places = {} #place -> indices of the climbers in that place
+        for index, place in enumerate(finalRank):
+            places.setdefault(place, []).append(index)
+        goodTestRank = None  # will save ranks that are more optimal than finalRank
         goodSum = sum  # saves the optimal sum that goes with the optimal rank (goodTestRank)
-        while (i < len(finalRank)):
-            tiedIndicesi = self.__getIndicesOfNum(finalRank, i)  # which climbers finished in ith place
-            tiedIndicesi1 = self.__getIndicesOfNum(finalRank, i + 1)  # which climbers finished in place i+1
+        i = 1  # will use to iterate through places climbers could be in in their finalRank
+        while (i < n):
+            tiedIndicesi = places.get(i, [])  # which climbers finished in ith place
+            tiedIndicesi1 = places.get(i + 1, [])  # which climbers finished in place i+1
             if (len(tiedIndicesi) > 1):  # tie for place i - we will see if one of the climbers should be in the next possible place instead
                 nextPlace = i + len(tiedIndicesi) - 1  # next place one climber could go (if three people tied for first, next place for one of them is third)
-                tiedClimbers = []  # list of climbers tied for place i
-                for index in tiedIndicesi:
-                    tiedClimbers.append(climbers[index])
-                for j in range(0, len(tiedIndicesi)):  # loops through tied climbers
-                    testRank = finalRank.copy()
-                    testRank[tiedIndicesi[
-                        j]] = nextPlace  # give one of the climbers tied for ith place next possible place place
-                    testSum = self.__calcSum(testRank, bd.d)
+                for moved in tiedIndicesi:  # loops through tied climbers
+                    others = [index for index in tiedIndicesi if index != moved]
+                    # moved is now behind the rest of the climbers it was tied with
+                    testSum = sum + np.sum(aheadCost[others, moved] - tiedCost[others, moved])
                     if (testSum < goodSum):
-                        goodTestRank = testRank.copy()
+                        goodTestRank = finalRank.copy()
+                        goodTestRank[moved] = nextPlace
                         goodSum = testSum
-                        better = True
                         break
-                if (i + len(tiedIndicesi) >= len(finalRank)):  # no better ranking close by
-                    if better:
-                        return self.__locallyKemenize(goodTestRank, ranks, tops, climbers, True)
-                    else:
-                        return finalRank
-            elif (len(
-                    tiedIndicesi1) > 1):  # tie for place i+1 - will see if we can switch climber in ith position with one tied for i+1 place
-                if (tops[finalRank.index(i)] != tops[
-                    finalRank.index(i + 1)]):  # can't switch because different numbers of tops
+                if (i + len(tiedIndicesi) >= n):  # no better ranking close by
+                    break
+            elif (len(tiedIndicesi1) > 1):  # tie for place i+1 - will see if we can switch climber in ith position with one tied for i+1 place
+                higher = tiedIndicesi[0]  # climber who finished in ith place
+                if (self.tops[higher] != self.tops[tiedIndicesi1[0]]):  # can't switch because different numbers of tops
                     i += 1
                     continue
-                tiedClimbers = []  # list of climbers tied for place i+1
-                for index in tiedIndicesi1:
-                    tiedClimbers.append(climbers[index])
-                for j in range(0, len(tiedIndicesi1)):
-                    testRank = finalRank.copy()
-                    testRank[tiedIndicesi1[j]] = i
-                    testRank[finalRank.index(i)] = i + 1
-                    testSum = self.__calcSum(testRank, bd.d)
+                for lower in tiedIndicesi1:
+                    others = [index for index in tiedIndicesi1 if index != lower]
+                    # lower is now ahead of higher and of the climbers it was tied with, higher is tied with them
+                    testSum = (sum + aheadCost[lower, higher] - aheadCost[higher, lower]
+                               + np.sum(tiedCost[higher, others] - aheadCost[higher, others])
+                               + np.sum(aheadCost[lower, others] - tiedCost[lower, others]))
                     if (testSum < goodSum):  # more optimal ranking
-                        goodTestRank = testRank.copy()
+                        goodTestRank = finalRank.copy()
+                        goodTestRank[lower] = i
+                        goodTestRank[higher] = i + 1
                         goodSum = testSum
-                        better = True
-                if (i == len(finalRank) - 1):  # no better final rankings close by
-                    if better:
-                        return self.__locallyKemenize(goodTestRank, ranks, tops, climbers, True)
-                    else:
-                        return finalRank
+                if (i == n - 1):  # no better final rankings close by
+                    break
             else:
-                higher = finalRank.index(i)  # climber who finished in ith place
-                lower = finalRank.index(i + 1)  # climber who finish in i+1 place
-                if (tops[higher] == tops[lower]):  # same number of tops so rankings can be switched
+                higher = tiedIndicesi[0]  # climber who finished in ith place
+                lower = tiedIndicesi1[0]  # climber who finish in i+1 place
+                if (self.tops[higher] == self.tops[lower]):  # same number of tops so rankings can be switched
                     # try fully switching them
-                    testRank = finalRank.copy()
-                    testRank[higher] = i + 1  # climber who finished in ith place now in place i+1
-                    testRank[lower] = i  # climber who finihsed in place i+1 now in place i
-                    testSum = self.__calcSum(testRank, bd.d)
+                    testSum = sum + aheadCost[lower, higher] - aheadCost[higher, lower]
                     if (testSum < goodSum):  # if the new testRank is "better" than the other finalRank
-                        goodTestRank = testRank.copy()  # save this testRank because it is optimal
-                        goodSum = testSum  # update optimal sum
-                        better = True
+                        goodTestRank = finalRank.copy()
+                        goodTestRank[higher] = i + 1  # climber who finished in ith place now in place i+1
+                        goodTestRank[lower] = i  # climber who finihsed in place i+1 now in place i
+                        goodSum = testSum
                     else:
                         # try having them both finish in ith place
-                        testRank[higher] = i
-                        testSum = self.__calcSum(testRank, bd.d)
-                        if (testSum < goodSum):  # if the new testRank is "better" than the other finalRank
-                            goodTestRank = testRank.copy()  # save this testRank because it is optimal
-                            goodSum = testSum  # update optimal sum
-                            better = True
-                if (i == len(finalRank) - 1):  # ranking is fixed because of number of tops and reached end of list
-                    if (better):
-                        return self.__locallyKemenize(goodTestRank, ranks, tops, climbers, True)
-                    else:
-                        return finalRank
+                        testSum = sum + tiedCost[higher, lower] - aheadCost[higher, lower]
+                        if (testSum < goodSum):
+                            goodTestRank = finalRank.copy()
+                            goodTestRank[lower] = i
+                            goodSum = testSum
+                if (i == n - 1):  # ranking is fixed because of number of tops and reached end of list
+                    break
             i += len(tiedIndicesi)
-
-    def __getIndicesOfNum(self, finalRank, i):
-        """return list of all the indices in finalRank i appears at"""
-        indices = []
-        for j in range(0, len(finalRank)):
-            if (finalRank[j] == i):
-                indices.append(j)
-        return indices
+        return goodTestRank, goodSum
 
     def runMethod(self, num):
         """
@@ -1020,6 +645,32 @@ class ClimbingRanker:
             method = self.locallyKemenize(self.methods[num-len(self.methods)])
             return method
 
+    def runAll(self, methods=None):
+        """
+        runs several methods on this data set at once. intermediates shared between methods (attempts to top, flashes,
+        hold values, USAC ranking points, weiszfeld's rating) are only calculated once, and a locally kemenized method
+        reuses the rank of the method it kemenizes if that method is also being run
+        :param methods: list of method numbers (as in runMethod), None runs every method in self.methods
+        :return: numpy matrix where row i is the rank given by methods[i] (rows = methods, columns = climbers)
+        """
+        if(methods is None):
+            methods = range(0, len(self.methods))
+        ranks = {} #method number -> rank, so each method is only run once
+        for num in methods:
+            if(num in ranks):
+                continue
+            if(num < len(self.methods)):
+                ranks[num] = self.methods[num]()
+            else:
+                baseNum = num - len(self.methods)
+                if(baseNum not in ranks):
+                    ranks[baseNum] = self.methods[baseNum]()
+                ranks[num] = self.__locallyKemenize(ranks[baseNum])
+        allRanks = np.zeros(shape=(len(methods), self.numClimbers))
+        for row, num in enumerate(methods):
+            allRanks[row] = ranks[num]
+        return allRanks
+
     def getMethod(self, num):
         """
         returns the name of the method that is called by num
@@ -1040,6 +691,24 @@ def getMethod(num):
     ranker = ClimbingRanker("fyaBNatsQualis2016.csv",0)
     return ranker.getMethod(num)
 
+def getMethodVersion(name):
+    """
+    :param name: name of a method (see getMethod)
+    :return: version string of the method (for a locally kemenized method it has the version of the method and of
+    local kemenization). linear programming methods also have the solver settings that can change which optimal rank
+    they find (see LinearProgramming.getSolverSettings), so results saved with other settings aren't reused
+    """
+    baseName = name[3:] if name.startswith("lk ") else name
+    if(name.startswith("lk ")):
+        version = "%d.%d" % (methodVersions.get(baseName, 1), methodVersions.get("lk", 1))
+    else:
+        version = str(methodVersions.get(baseName, 1))
+    if(baseName.startswith("linearProgramming")):
+        settings = lp.getSolverSettings()
+        for setting in ["exactMaxSize", "dpMaxSize", "cutTolerance", "useSolutionCache"]: #not the cache's location/size
+            version += " %s=%r" % (setting, settings[setting])
+    return version
+
 # ranker = ClimbingRanker("fybBNatsSemis2016.csv")
 # print(ranker.points)
 # print(ranker.l2NormMethodNoTops())
@@ -1,38 +1,148 @@
 import csv
+import os
+from itertools import islice
 import numpy as np
 
+def compiledPath(fileName):
+    """
+    :param fileName: csv file in the csvFiles folder
+    :return: folder where the compiled (binary) version of fileName is kept (see CompileData.py)
+    """
+    return "compiledFiles/" + fileName[:-4]
+
+def isCompiled(fileName):
+    """
+    :param fileName: csv file in the csvFiles folder
+    :return: True if there is a compiled version of fileName that was made from the current csv file
+    """
+    infoPath = compiledPath(fileName) + "/info.npy"
+    if(not(os.path.exists(infoPath))):
+        return False
+    source = os.stat("csvFiles/" + fileName)
+    info = np.load(infoPath)
+    return info[0] == source.st_mtime_ns and info[1] == source.st_size
+
 class ClimbingDataFile:
 
-    def __init__(self, fileName, n): #reads in first n climbers from fileName (if you want all climbers n=0)
+    def __init__(self, fileName, n, rowIndices=None): #reads in first n climbers from fileName (if you want all climbers n=0)
         """
         creates a new ClimbingDataFile object
         :param fileName: file where data will be read in from
         :param n: how many climbers will be read in from the data set (n=0 reads in all climbers)
+        :param rowIndices: optional - list of climber indices (0 = first climber after the header) to read in, in that
+        order, instead of the first n climbers
         """
         self.fileName = fileName
-        self.openFile(n)
-        self.calcNumProblems()
+        self.openFile(n, rowIndices)
 
-    def openFile(self, n): #n = number of lines to be read
+    def openFile(self, n, rowIndices=None): #n = number of lines to be read
         """
-        reads in data from file and stores it in self.climbingData (2D list)
+        reads in data from the compiled version of the file if it is up to date and from the csv file otherwise
         :param n: number of lines to be read from file (n=0 means read all lines)
+        :param rowIndices: optional - list of climber indices to read in instead of the first n climbers
+        """
+        if(isCompiled(self.fileName)):
+            self.openCompiled(n, rowIndices)
+        else:
+            self.openCSV(n, rowIndices)
+
+    def openCSV(self, n, rowIndices=None):
+        """
+        reads in data from csv file and parses it (in one pass) into typed numpy column arrays: self.names,
+        self.highMatrix, self.attemptsMatrix, self.rankMatrix and self.topsColumn. the file is streamed and reading
+        stops as soon as the requested rows have been read
+        :param n: number of lines to be read from file (n=0 means read all lines)
+        :param rowIndices: optional - list of climber indices to read in instead of the first n climbers
         """
         path = "csvFiles/" + self.fileName
         with open(path, 'r') as f:
             reader = csv.reader(f)
-            self.climbingData = list(reader)
-        if(n == 0):
-            return self.climbingData
-        for i in range(n+1,len(self.climbingData)):
-            self.climbingData.pop()
-        return self.climbingData
+            self.header = next(reader)
+            rows = self.readRows(reader, n, rowIndices)
+        self.calcNumProblems()
+        self.parseColumns(rows)
+        self.topsPerProblem = None #not known until GetTopsInfo.getTopsInfo is run on the data
+        self.topsUndeterminable = False
+
+    def readRows(self, reader, n, rowIndices):
+        """
+        :param reader: csv reader positioned just after the header
+        :param n: number of rows to be read (n=0 means read all rows)
+        :param rowIndices: optional - list of row indices to read in (in that order) instead of the first n rows
+        :return: 2D list of the rows that were asked for (nothing after the last of them is read)
+        :raise IndexError: if one of rowIndices is past the end of the file
+        """
+        if(rowIndices is None):
+            if(n == 0):
+                return list(reader)
+            return list(islice(reader, n))
+        wanted = set(rowIndices)
+        found = {}
+        for index, row in enumerate(islice(reader, max(rowIndices, default=-1) + 1)):
+            if(index in wanted):
+                found[index] = row
+        if(len(found) != len(wanted)):
+            raise IndexError("row index out of range for " + self.fileName)
+        return [found[index] for index in rowIndices]
+
+    def openCompiled(self, n, rowIndices=None):
+        """
+        memory maps the arrays of the compiled version of the file (no parsing and no need to rerun
+        GetTopsInfo.getTopsInfo if all climbers are read)
+        :param n: number of lines to be read from file (n=0 means read all lines)
+        :param rowIndices: optional - list of climber indices to read in instead of the first n climbers
+        """
+        path = compiledPath(self.fileName) + "/"
+        names = np.load(path + "names.npy").tolist()
+        allClimbers = (rowIndices is None and (n == 0 or n >= len(names)))
+        if(rowIndices is not None):
+            rows = list(rowIndices) #fancy indexing only copies the rows that were asked for
+        elif(allClimbers):
+            rows = slice(None)
+        else:
+            rows = slice(0, n)
+        #np.asarray keeps the arrays backed by the mapped file but makes them plain numpy arrays
+        self.names = names[rows] if rowIndices is None else [names[index] for index in rows]
+        self.highMatrix = np.asarray(np.load(path + "highMatrix.npy", mmap_mode='r'))[rows]
+        self.attemptsMatrix = np.asarray(np.load(path + "attemptsMatrix.npy", mmap_mode='r'))[rows]
+        self.rankMatrix = np.asarray(np.load(path + "rankMatrix.npy", mmap_mode='r'))[rows]
+        self.topsColumn = np.asarray(np.load(path + "topsColumn.npy", mmap_mode='r'))[rows]
+        self.numProblems = self.rankMatrix.shape[1]
+        #tops per problem is inferred from all the climbers, so it can only be reused when all of them are read in
+        self.topsPerProblem = None
+        self.topsUndeterminable = False
+        topsStatus = np.load(path + "info.npy")[2]
+        if(allClimbers):
+            if(topsStatus == 1):
+                self.topsPerProblem = np.asarray(np.load(path + "topsPerProblem.npy", mmap_mode='r'))
+            elif(topsStatus == 0):
+                self.topsUndeterminable = True
+
+    def parseColumns(self, rows):
+        """
+        turns the rows of the data set (without the header) into numpy column arrays. each problem has 4 columns in the
+        file (high, attempts, rank, points) after the number and name columns, and the tops column is second to last
+        :param rows: 2D list of strings, one row per climber
+        """
+        numClimbers = len(rows)
+        self.names = [row[1] for row in rows]
+        problemColumns = np.array([row[2:2 + 4*self.numProblems] for row in rows], dtype=float)
+        problemColumns = problemColumns.reshape(numClimbers, self.numProblems, 4)
+        self.highMatrix = np.ascontiguousarray(problemColumns[:, :, 0])
+        self.attemptsMatrix = np.ascontiguousarray(problemColumns[:, :, 1])
+        self.rankMatrix = np.ascontiguousarray(problemColumns[:, :, 2])
+        self.topsColumn = np.zeros(numClimbers, dtype=int)
+        for row in range(0, numClimbers):
+            try:
+                self.topsColumn[row] = int(rows[row][-2])
+            except ValueError:
+                self.topsColumn[row] = 0 #for some reason there is just ,, in the file instead of ,0,
 
     def calcNumProblems(self):
         """
         calculates number of problems in data set and stores as self.numProblems
         """
-        temp = (len(self.climbingData[0])-4)/4
+        temp = (len(self.header)-4)/4
         if(not(temp == int(temp))):
             raise Exception("not integer number of problems: ", temp)
         else:
@@ -42,75 +152,47 @@ class ClimbingDataFile:
         """
         :return: 1D list of climbers in the order they appear in data set
         """
-        self.climbers = []
-        for row in range(1,len(self.climbingData)): #row 0 just has column headers - don't need those
-            self.climbers.append(self.climbingData[row][1])
+        self.climbers = list(self.names)
         return self.climbers
 
     def getTops(self):
         """
         :return: 1D list of tops for each climber in order of climbers list
         """
-        self.tops = []
-        for row in range(1,len(self.climbingData)):
-            try:
-                self.tops.append(int(self.climbingData[row][-2]))
-            except ValueError:
-                self.tops.append(0) #for some reason there is just ,, in the file instead of ,0,
+        self.tops = self.topsColumn.tolist()
         return self.tops
 
     def getRanks(self):
         """
         :return: numpy matrix where each column corresponds to the rank of a climber on each problem
         """
-        self.ranks = np.zeros(shape=(len(self.climbingData)-1, self.numProblems))
-        for row in range(0,len(self.climbingData)-1):
-            for col in range(0,self.numProblems):
-                self.ranks[row][col] = self.climbingData[row+1][col*4+4]
+        self.ranks = self.rankMatrix
         return self.ranks
 
     def getPoints(self):
         """
         :return: 1D list where each entry corresponds to the total number of points (holds) of that climber
         """
-        self.points = []
-        for row in range(0,len(self.climbingData)-1):
-            p = 0
-            for col in range(0,self.numProblems):
-                p += int(self.climbingData[row+1][col*4+2])
-            self.points.append(p)
+        self.points = self.highMatrix.sum(axis=1).astype(int).tolist()
         return self.points
 
     def getPointsPerProblem(self):
         """
         :return: numpy matrix where each column corresponds to the number of points a climber got on the problem
         """
-        self.probPoints = np.zeros(shape=(len(self.climbingData) - 1, self.numProblems))
-        for row in range(0, len(self.climbingData) - 1):
-            for col in range(0, self.numProblems):
-                self.probPoints[row][col] = self.climbingData[row + 1][col * 4 + 2]
+        self.probPoints = self.highMatrix
         return self.probPoints
 
     def getAttempts(self):
         """
         :return: 1D list of total number of attempts for each climber in order of climbers list
         """
-        self.attempts = []
-        for row in range(0,len(self.climbingData)-1):
-            sum = 0
-            for col in range(0,self.numProblems):
-                sum+= int(self.climbingData[row+1][col*4+3])
-            self.attempts.append(sum)
+        self.attempts = self.attemptsMatrix.sum(axis=1).astype(int).tolist()
         return self.attempts
 
     def getAttemptsPerProblem(self):
         """
         :return: numpy matrix where each column corresponds to the number of attempts a climber had on the problem
         """
-        self.probAttempts = np.zeros(shape=(len(self.climbingData) - 1, self.numProblems))
-        for row in range(0, len(self.climbingData) - 1):
-            for col in range(0, self.numProblems):
-                self.probAttempts[row][col] = self.climbingData[row + 1][col * 4 + 3]
+        self.probAttempts = self.attemptsMatrix
         return self.probAttempts
-
-
@@ -0,0 +1,99 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+#content addressed cache of linear program solutions (see LinearProgramming.solveGroup). solutions are kept in memory
+#(least recently used ones are dropped) and, if a directory is set, also saved as .npy files named by their key so they
+#are still there when the program is run again
+maxCacheSize = 4096 #number of solutions kept in memory before the least recently used one is dropped
+cacheDirectory = None #folder solutions are also saved in (None = only keep them in memory)
+cache = OrderedDict()
+cacheLock = threading.Lock()
+
+def makeKey(matrix, solver):
+    """
+    :param matrix: numpy matrix the solution was found from (like c in canonical order)
+    :param solver: string naming how the solution is found (different solvers can find different optimal solutions)
+    :return: hex string of the sha256 hash of the solver, the shape and the entries of matrix
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    digest = hashlib.sha256()
+    digest.update(solver.encode())
+    digest.update(np.array(matrix.shape, dtype=np.int64).tobytes())
+    digest.update(matrix.tobytes())
+    return digest.hexdigest()
+
+def get(key):
+    """
+    :param key: key made by makeKey
+    :return: the saved solution (read only numpy array) or None if there isn't one
+    """
+    with cacheLock:
+        solution = cache.get(key)
+        if(solution is not None):
+            cache.move_to_end(key)
+            return solution
+    if(cacheDirectory is None):
+        return None
+    path = os.path.join(cacheDirectory, key + ".npy")
+    if(not(os.path.exists(path))):
+        return None
+    solution = np.load(path)
+    remember(key, solution)
+    return solution
+
+def put(key, solution):
+    """
+    saves solution in memory and, if cacheDirectory is set, on disk
+    :param key: key made by makeKey
+    :param solution: numpy array
+    """
+    solution = np.array(solution, dtype=float)
+    remember(key, solution)
+    if(cacheDirectory is not None):
+        os.makedirs(cacheDirectory, exist_ok=True)
+        path = os.path.join(cacheDirectory, key + ".npy")
+        temporaryPath = path + ".%d.%d.tmp" % (os.getpid(), threading.get_ident())
+        with open(temporaryPath, 'wb') as f:
+            np.save(f, solution)
+        os.replace(temporaryPath, path) #so another process never reads a half written file
+
+def remember(key, solution):
+    """
+    keeps solution in memory, dropping the least recently used solutions if there are too many
+    :param key: key made by makeKey
+    :param solution: numpy array
+    """
+    solution.setflags(write=False) #shared by everything that asks for it
+    with cacheLock:
+        cache[key] = solution
+        cache.move_to_end(key)
+        while(len(cache) > maxCacheSize):
+            cache.popitem(last=False)
+
+def setMaxCacheSize(size):
+    """
+    changes how many solutions are kept in memory, dropping the least recently used ones if there are too many
+    :param size: new maximum number of solutions kept in memory
+    """
+    global maxCacheSize
+    with cacheLock:
+        maxCacheSize = size
+        while(len(cache) > maxCacheSize):
+            cache.popitem(last=False)
+
+def setCacheDirectory(directory):
+    """
+    :param directory: folder solutions will also be saved in and read from (None to only keep them in memory)
+    """
+    global cacheDirectory
+    cacheDirectory = directory
+
+def clear():
+    """
+    removes every solution kept in memory (solutions saved on disk are kept)
+    """
+    with cacheLock:
+        cache.clear()
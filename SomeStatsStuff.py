@@ -1,5 +1,4 @@
-import GetTopsInfo as gti
-from ReadInData import ClimbingDataFile
+import DataCache as dc
 import numpy as np
 
 def getAverageNumberOfHolds(youthCategory):
@@ -9,15 +8,13 @@ def getAverageNumberOfHolds(youthCategory):
     :param youthCategory: category
     :return: average number of holds
     """
-    semisData = ClimbingDataFile(youthCategory + "BNatsSemis2016.csv", 0)
-    qualisData = ClimbingDataFile(youthCategory + "BNatsQualis2016.csv", 0)
-    finalsData = ClimbingDataFile(youthCategory + "BNatsFinals2016.csv", 0)
-    tops = [finalsData.getTops(), semisData.getTops(), qualisData.getTops()]
-    points = [finalsData.getPointsPerProblem(), semisData.getPointsPerProblem(), qualisData.getPointsPerProblem()]
+    fileNames = [youthCategory + "BNatsFinals2016.csv", youthCategory + "BNatsSemis2016.csv",
+                 youthCategory + "BNatsQualis2016.csv"]
+    points = [dc.getDataFile(fileName).getPointsPerProblem() for fileName in fileNames]
     holdNumbers = []
-    for i in range(0,len(tops)):
+    for i in range(0,len(fileNames)):
         try:
-            topsPerProblem = gti.getTopsInfo(points[i], tops[i])
+            topsPerProblem = dc.getTopsPerProblem(fileNames[i])
             for col in range(0, len(topsPerProblem[0])):
                 for row in range(0, len(topsPerProblem)):
                     if(topsPerProblem[row][col] == 1):